@@ -132,6 +132,7 @@ describe("AttendanceService", () => {
           provide: FaceService,
           useValue: {
             recognize: jest.fn(),
+            verify: jest.fn(),
           },
         },
       ],
@@ -264,6 +265,78 @@ describe("AttendanceService", () => {
       );
     });
 
+    it("forwards the ROI hint and returns the detected face box", async () => {
+      faceService.recognize.mockResolvedValue({
+        personnelId: 10,
+        confidence: 0.85,
+        bbox: [110, 60, 190, 150],
+      });
+      const created = mockRecord({ type: AttendanceType.TimeIn });
+      attendanceRepo.create.mockReturnValue(created);
+      attendanceRepo.save.mockResolvedValue(created);
+
+      const result = await service.capture(
+        { ...dto, stationId: 1, roi: [100, 50, 200, 160] },
+        adminUser,
+      );
+
+      expect(faceService.recognize).toHaveBeenCalledWith(VALID_IMAGE, 1, [
+        100, 50, 200, 160,
+      ]);
+      expect(result.bbox).toEqual([110, 60, 190, 150]);
+    });
+
+    it("verifies 1:1 instead of recognizing when personnelId is given", async () => {
+      faceService.verify.mockResolvedValue({
+        personnelId: 10,
+        confidence: 0.85,
+      });
+      const created = mockRecord({ type: AttendanceType.TimeIn });
+      attendanceRepo.create.mockReturnValue(created);
+      attendanceRepo.save.mockResolvedValue(created);
+
+      await service.capture({ ...dto, personnelId: 10 }, adminUser);
+
+      expect(faceService.verify).toHaveBeenCalledWith(VALID_IMAGE, 10);
+      expect(faceService.recognize).not.toHaveBeenCalled();
+      expect(attendanceRepo.save).toHaveBeenCalled();
+    });
+
+    it("throws ForbiddenException if station_user claims another station's personnel", async () => {
+      personnelRepo.findOne.mockResolvedValue(mockPersonnel({ stationId: 99 }));
+
+      await expect(
+        service.capture({ ...dto, personnelId: 10 }, stationUser),
+      ).rejects.toThrow(ForbiddenException);
+      expect(faceService.verify).not.toHaveBeenCalled();
+      expect(attendanceRepo.save).not.toHaveBeenCalled();
+      expect(pendingRepo.save).not.toHaveBeenCalled();
+    });
+
+    it("throws NotFoundException for an unknown claimed personnelId", async () => {
+      personnelRepo.findOne.mockResolvedValue(null);
+
+      await expect(
+        service.capture({ ...dto, personnelId: 404 }, adminUser),
+      ).rejects.toThrow(NotFoundException);
+      expect(faceService.verify).not.toHaveBeenCalled();
+    });
+
+    it("lets station_user verify their own station's personnel", async () => {
+      faceService.verify.mockResolvedValue({
+        personnelId: 10,
+        confidence: 0.85,
+      });
+      const created = mockRecord({ type: AttendanceType.TimeIn });
+      attendanceRepo.create.mockReturnValue(created);
+      attendanceRepo.save.mockResolvedValue(created);
+
+      await service.capture({ ...dto, personnelId: 10 }, stationUser);
+
+      expect(faceService.verify).toHaveBeenCalledWith(VALID_IMAGE, 10);
+      expect(attendanceRepo.save).toHaveBeenCalled();
+    });
+
     it("wraps FaceService errors as UnprocessableEntityException", async () => {
       faceService.recognize.mockRejectedValue(
         new ServiceUnavailableException("Face recognition service unavailable"),
@@ -48,6 +48,11 @@ interface DayAttendanceState {
   scopeLabel: "today" | "current shift";
 }
 
+/** A capture's saved record, with the detected face box when recognized. */
+export type CaptureResult = (AttendanceRecord | PendingApproval) & {
+  bbox?: number[];
+};
+
 interface DutyValidationResult {
   shouldPend: boolean;
   reason?: string;
@@ -486,38 +491,74 @@ export class AttendanceService {
     return this.pendingRepo.save(pending);
   }
 
+  /** Attach the detected face box so the client can send it back as `roi`. */
+  private withBbox(
+    saved: AttendanceRecord | PendingApproval,
+    bbox?: number[],
+  ): CaptureResult {
+    return bbox ? Object.assign(saved, { bbox }) : saved;
+  }
+
   /**
    * POST /api/v1/attendance/capture
-   * Validate image → call FaceService.recognize() → route by confidence threshold.
+   * Validate image → call FaceService.recognize() (or verify() when the
+   * caller already knows the personnel ID) → route by confidence threshold.
    * Requirements: 5.1, 5.2, 5.3, 5.6, 5.7, 5.8, 5.9, 5.10, 5.11, 5.14
    */
   async capture(
     dto: CaptureAttendanceDto,
     currentUser: AuthenticatedUser,
-  ): Promise<AttendanceRecord | PendingApproval> {
+  ): Promise<CaptureResult> {
     // Validate image format and size (Requirements 15.11, 15.12)
     this.validateImage(dto.image);
 
     // Use user's station if not provided
     const stationId = dto.stationId ?? currentUser.stationId ?? 0;
 
+    // A claimed identity is scoped like a manual entry: station_user can
+    // only capture for their own station's personnel (Requirement 6.8)
+    let claimed: Personnel | null = null;
+    if (dto.personnelId !== undefined) {
+      claimed = await this.personnelRepo.findOne({
+        where: { id: dto.personnelId },
+      });
+      if (!claimed) {
+        throw new NotFoundException(`Personnel #${dto.personnelId} not found`);
+      }
+      if (
+        currentUser.role === "station_user" &&
+        claimed.stationId !== currentUser.stationId
+      ) {
+        throw new ForbiddenException(
+          "You can only capture attendance for your station's personnel.",
+        );
+      }
+    }
+
     // Call Face Service (Requirements 5.3, 5.4, 5.5)
     let personnelId: number;
     let confidence: number;
+    let bbox: number[] | undefined;
     const capturedAt = new Date();
     try {
-      const result = await this.faceService.recognize(dto.image, stationId);
+      // A claimed identity only needs a 1:1 check, not a gallery search.
+      const result = claimed
+        ? await this.faceService.verify(dto.image, claimed.id)
+        : await this.faceService.recognize(dto.image, stationId, dto.roi);
       personnelId = result.personnelId;
       confidence = result.confidence;
+      bbox = result.bbox;
     } catch (err: unknown) {
       const message =
         err instanceof Error ? err.message : "Face recognition failed";
       throw new UnprocessableEntityException(message);
     }
 
-    const personnel = await this.personnelRepo.findOne({
-      where: { id: personnelId },
-    });
+    const personnel =
+      claimed ??
+      (await this.personnelRepo.findOne({
+        where: { id: personnelId },
+      }));
     if (!personnel) {
       throw new NotFoundException(`Personnel #${personnelId} not found`);
     }
@@ -556,12 +597,15 @@ export class AttendanceService {
 
     if (confidence >= 0.6) {
       if (dutyValidation.shouldPend) {
-        return this.createPendingAttendance(
-          personnelId,
-          resolvedType,
-          confidence,
-          dto.image,
-          capturedAt,
+        return this.withBbox(
+          await this.createPendingAttendance(
+            personnelId,
+            resolvedType,
+            confidence,
+            dto.image,
+            capturedAt,
+          ),
+          bbox,
         );
       }
 
@@ -575,14 +619,17 @@ export class AttendanceService {
         createdBy: currentUser.id,
         createdAt: capturedAt,
       });
-      return this.attendanceRepo.save(record);
+      return this.withBbox(await this.attendanceRepo.save(record), bbox);
     } else if (confidence >= 0.4) {
-      return this.createPendingAttendance(
-        personnelId,
-        resolvedType,
-        confidence,
-        dto.image,
-        capturedAt,
+      return this.withBbox(
+        await this.createPendingAttendance(
+          personnelId,
+          resolvedType,
+          confidence,
+          dto.image,
+          capturedAt,
+        ),
+        bbox,
       );
     } else {
       // Low confidence → HTTP 422 (Requirement 5.7)
@@ -4,6 +4,9 @@ import {
   IsNumber,
   IsOptional,
   IsEnum,
+  IsArray,
+  ArrayMinSize,
+  ArrayMaxSize,
 } from "class-validator";
 import { ApiProperty } from "@nestjs/swagger";
 import { AttendanceType } from "../../database/entities/attendance.entity";
@@ -25,6 +28,28 @@ export class CaptureAttendanceDto {
   @IsOptional()
   stationId?: number;
 
+  @ApiProperty({
+    description:
+      "Personnel ID already known from a badge tap or manual entry. The face is then verified against this person only instead of searched in the station gallery.",
+    required: false,
+  })
+  @IsNumber()
+  @IsOptional()
+  personnelId?: number;
+
+  @ApiProperty({
+    description:
+      "Face box [x1, y1, x2, y2] in image pixels, e.g. from a client-side face tracker or the `bbox` of the previous capture. Detection looks near it first and falls back to the whole image.",
+    required: false,
+    type: [Number],
+  })
+  @IsArray()
+  @ArrayMinSize(4)
+  @ArrayMaxSize(4)
+  @IsNumber({ allowNaN: false, allowInfinity: false }, { each: true })
+  @IsOptional()
+  roi?: number[];
+
   @ApiProperty({
     enum: AttendanceType,
     description: "Requested attendance type (time_in or time_out)",
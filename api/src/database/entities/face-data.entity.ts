@@ -4,6 +4,7 @@ import {
   Column,
   ManyToOne,
   JoinColumn,
+  Index,
 } from "typeorm";
 import { Personnel } from "./personnel.entity";
 
@@ -12,6 +13,10 @@ import { Personnel } from "./personnel.entity";
  * after successful face registration. (Requirements 4.7, 4.8)
  */
 @Entity("face_embeddings")
+@Index("IDX_face_embeddings_model_version_personnel", [
+  "modelVersion",
+  "personnelId",
+])
 export class FaceEmbedding {
   @PrimaryGeneratedColumn()
   id: number;
@@ -29,6 +34,19 @@ export class FaceEmbedding {
   @Column({ type: "json" })
   embedding: number[];
 
+  /**
+   * Face model that produced the embedding. The face service only matches
+   * against its active EMBEDDING_MODEL_VERSION, so templates for a new
+   * model can be generated before cutover.
+   */
+  @Column({
+    type: "varchar",
+    length: 64,
+    name: "model_version",
+    default: "buffalo_l",
+  })
+  modelVersion: string;
+
   @Column({ type: "datetime", name: "created_at", default: () => "NOW()" })
   createdAt: Date;
 }
@@ -0,0 +1,44 @@
+import { MigrationInterface, QueryRunner } from "typeorm";
+
+/**
+ * FaceEmbeddingModelVersion — tags each face embedding with the face model
+ * that produced it so templates for a new model can be generated (face
+ * service reembed.py) while recognition keeps using the current ones.
+ *
+ * Existing rows are tagged "buffalo_l", the model they were created with.
+ */
+export class FaceEmbeddingModelVersion1700000000001
+  implements MigrationInterface
+{
+  name = "FaceEmbeddingModelVersion1700000000001";
+
+  public async up(queryRunner: QueryRunner): Promise<void> {
+    // TypeORM synchronize may already have created the column and index
+    // from the entity definition.
+    if (!(await queryRunner.hasColumn("face_embeddings", "model_version"))) {
+      await queryRunner.query(`
+        ALTER TABLE \`face_embeddings\`
+          ADD COLUMN \`model_version\` VARCHAR(64) NOT NULL DEFAULT 'buffalo_l' AFTER \`embedding\`
+      `);
+    }
+    const table = await queryRunner.getTable("face_embeddings");
+    const hasIndex = table?.indices.some(
+      (index) => index.name === "IDX_face_embeddings_model_version_personnel"
+    );
+    if (!hasIndex) {
+      await queryRunner.query(`
+        CREATE INDEX \`IDX_face_embeddings_model_version_personnel\`
+          ON \`face_embeddings\` (\`model_version\`, \`personnel_id\`)
+      `);
+    }
+  }
+
+  public async down(queryRunner: QueryRunner): Promise<void> {
+    await queryRunner.query(
+      `DROP INDEX \`IDX_face_embeddings_model_version_personnel\` ON \`face_embeddings\``
+    );
+    await queryRunner.query(
+      `ALTER TABLE \`face_embeddings\` DROP COLUMN \`model_version\``
+    );
+  }
+}
@@ -6,9 +6,13 @@ import {
 import { ConfigService } from "@nestjs/config";
 import axios, { AxiosInstance } from "axios";
 
+const FACE_SERVICE_TIMEOUT_MS = 120_000;
+
 export interface RecognizeResult {
   personnelId: number;
   confidence: number;
+  /** Detected face box [x1, y1, x2, y2]; pass back as the next frame's ROI. */
+  bbox?: number[];
 }
 
 export interface RegisterFaceResult {
@@ -32,20 +36,28 @@ export class FaceService {
       "http://localhost:5001";
     this.client = axios.create({
       baseURL: this.baseUrl,
-      timeout: 120_000,
+      timeout: FACE_SERVICE_TIMEOUT_MS,
+      // Lets the face service drop queued work we have stopped waiting for.
+      headers: { "X-Request-Timeout-Ms": String(FACE_SERVICE_TIMEOUT_MS) },
     });
   }
 
-  async recognize(image: string, stationId: number): Promise<RecognizeResult> {
+  async recognize(
+    image: string,
+    stationId: number,
+    roi?: number[]
+  ): Promise<RecognizeResult> {
     const res = await this.withRetry(() =>
       this.client.post<{
         success: boolean;
         personnel_id: number;
         confidence: number;
         message?: string;
+        bbox?: number[];
       }>("/recognize", {
         image,
         station_id: stationId,
+        roi: roi ?? null,
       })
     );
 
@@ -53,6 +65,31 @@ export class FaceService {
       throw new Error(res.data.message ?? "Face recognition failed");
     }
 
+    return {
+      personnelId: res.data.personnel_id,
+      confidence: res.data.confidence,
+      bbox: res.data.bbox,
+    };
+  }
+
+  /** 1:1 check of a face image against one claimed person. */
+  async verify(image: string, personnelId: number): Promise<RecognizeResult> {
+    const res = await this.withRetry(() =>
+      this.client.post<{
+        success: boolean;
+        personnel_id: number;
+        confidence: number;
+        message?: string;
+      }>("/verify", {
+        image,
+        personnel_id: personnelId,
+      })
+    );
+
+    if (!res.data.success) {
+      throw new Error(res.data.message ?? "Face verification failed");
+    }
+
     return {
       personnelId: res.data.personnel_id,
       confidence: res.data.confidence,
@@ -117,11 +154,28 @@ export class FaceService {
         "Failed to invalidate face-service cache: %s",
         err instanceof Error ? err.message : String(err)
       );
-      // Non-fatal — cache will expire on its own (TTL 60s)
+      // Non-fatal — the face service detects gallery changes on its own
       return { success: false, message: "Cache invalidation skipped" };
     }
   }
 
+  /**
+   * Delete a person's archived enrolment images on the face service, so
+   * they are not used to regenerate templates after a model upgrade.
+   */
+  async deleteEnrolmentImages(personnelId: number): Promise<void> {
+    try {
+      await this.client.post("/delete-enrolment-images", {
+        personnel_id: personnelId,
+      });
+    } catch (err: unknown) {
+      const reason = err instanceof Error ? err.message : String(err);
+      this.logger.warn(
+        `Failed to delete enrolment images of personnel ${personnelId}: ${reason}`
+      );
+    }
+  }
+
   /** Ping the face service — used by health check. */
   async ping(): Promise<boolean> {
     try {
@@ -36,6 +36,7 @@ const mockFaceEmbeddingRepo = () => ({
 const mockFaceService = () => ({
   registerFace: jest.fn(),
   invalidateCache: jest.fn(),
+  deleteEnrolmentImages: jest.fn(),
 });
 
 const adminUser = { id: 1, role: "admin", stationId: null };
@@ -324,6 +325,7 @@ describe("PersonnelService", () => {
         service.remove(10, adminUser, true)
       ).resolves.toBeUndefined();
       expect(personnelRepo.remove).toHaveBeenCalledWith(p);
+      expect(faceService.deleteEnrolmentImages).toHaveBeenCalledWith(10);
     });
 
     it("station_user cannot delete personnel from another station", async () => {
@@ -333,6 +335,20 @@ describe("PersonnelService", () => {
       await expect(service.remove(10, stationUser)).rejects.toThrow(
         ForbiddenException
       );
+      expect(faceService.deleteEnrolmentImages).not.toHaveBeenCalled();
+    });
+  });
+
+  // ─── deleteAllFaces ───────────────────────────────────────────────────────
+
+  describe("deleteAllFaces", () => {
+    it("deletes the templates and the archived enrolment images", async () => {
+      personnelRepo.findOne.mockResolvedValue(makePersonnel());
+
+      await service.deleteAllFaces(10, adminUser);
+
+      expect(faceEmbeddingRepo.delete).toHaveBeenCalledWith({ personnelId: 10 });
+      expect(faceService.deleteEnrolmentImages).toHaveBeenCalledWith(10);
     });
   });
 
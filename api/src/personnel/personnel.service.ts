@@ -301,6 +301,7 @@ export class PersonnelService {
   ): Promise<void> {
     await this.findOne(personnelId, currentUser);
     await this.faceEmbeddingRepo.delete({ personnelId });
+    await this.faceService.deleteEnrolmentImages(personnelId);
   }
 
   /**
@@ -326,6 +327,7 @@ export class PersonnelService {
     }
 
     await this.personnelRepo.remove(personnel);
+    await this.faceService.deleteEnrolmentImages(id);
   }
 
   /**
@@ -2,6 +2,7 @@ import "reflect-metadata";
 import * as dotenv from "dotenv";
 import { DataSource } from "typeorm";
 import { InitialSchema1700000000000 } from "../database/migrations/1700000000000-InitialSchema";
+import { FaceEmbeddingModelVersion1700000000001 } from "../database/migrations/1700000000001-FaceEmbeddingModelVersion";
 
 dotenv.config();
 
@@ -12,7 +13,10 @@ const dataSource = new DataSource({
   username: process.env.DB_USER ?? "root",
   password: process.env.DB_PASS ?? "",
   database: process.env.DB_NAME ?? "bfp_sorsogon_attendance",
-  migrations: [InitialSchema1700000000000],
+  migrations: [
+    InitialSchema1700000000000,
+    FaceEmbeddingModelVersion1700000000001,
+  ],
   logging: true,
 });
 
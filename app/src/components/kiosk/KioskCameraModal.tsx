@@ -31,6 +31,8 @@ const MIN_BLINK_CLOSED_MS = 80;
 const MAX_BLINK_CLOSED_MS = 1200;
 const MAX_RECOVERY_RETRIES = 3;
 const RECOVERY_RETRY_DELAY_MS = 450;
+const CAPTURE_WIDTH = 640;
+const CAPTURE_HEIGHT = 480;
 const MEDIAPIPE_WASM_ROOT =
   "https://cdn.jsdelivr.net/npm/@mediapipe/tasks-vision@0.10.34/wasm";
 const FACELANDMARKER_MODEL_URL =
@@ -125,6 +127,22 @@ function getEyeAspectRatio(
   return (verticalDistanceA + verticalDistanceB) / (2 * horizontalDistance);
 }
 
+/** Face box [x1, y1, x2, y2] in capture pixels, sent as the capture's ROI hint. */
+function getFaceBox(
+  landmarks: NormalizedLandmark[] | undefined,
+): number[] | null {
+  if (!landmarks?.length) return null;
+  const xs = landmarks.map((point) => point.x * CAPTURE_WIDTH);
+  const ys = landmarks.map((point) => point.y * CAPTURE_HEIGHT);
+  const box = [
+    Math.min(...xs),
+    Math.min(...ys),
+    Math.max(...xs),
+    Math.max(...ys),
+  ];
+  return box[2] > box[0] && box[3] > box[1] ? box : null;
+}
+
 function getBlinkMetrics(result: FaceLandmarkerResult): BlinkMetrics {
   const hasFace =
     Boolean(result.faceLandmarks?.[0]?.length) ||
@@ -257,6 +275,7 @@ export default function KioskCameraModal({
   const eyesClosedRef = useRef(false);
   const eyesClosedAtRef = useRef<number | null>(null);
   const captureTriggeredRef = useRef(false);
+  const faceBoxRef = useRef<number[] | null>(null);
   const [phase, setPhase] = useState<Phase>("init");
   const [autoClose, setAutoClose] = useState(AUTO_CLOSE_SEC);
   const [resultData, setResultData] = useState<CaptureResultData | null>(null);
@@ -286,6 +305,7 @@ export default function KioskCameraModal({
     eyesClosedRef.current = false;
     eyesClosedAtRef.current = null;
     captureTriggeredRef.current = false;
+    faceBoxRef.current = null;
     setBlinkCount(0);
     setFaceDetected(false);
     setBlinkDebug({ blinkScore: null, ear: null });
@@ -444,14 +464,16 @@ export default function KioskCameraModal({
 
     const ctx = canvas.getContext("2d");
     if (!ctx) return;
-    ctx.drawImage(video, 0, 0, 640, 480);
+    ctx.drawImage(video, 0, 0, CAPTURE_WIDTH, CAPTURE_HEIGHT);
     const imageData = canvas.toDataURL("image/jpeg", 0.9);
+    // The tracked face box lets the face service detect on a small crop.
+    const roi = faceBoxRef.current;
     stopStream();
 
     try {
       const res = await apiClient.post<ApiEnvelope<Record<string, unknown>>>(
         "/api/v1/attendance/capture",
-        { image: imageData, type },
+        { image: imageData, type, ...(roi ? { roi } : {}) },
       );
       const raw = res.data.data ?? {};
 
@@ -556,6 +578,7 @@ export default function KioskCameraModal({
       }
       const { blinkScore, ear, hasFace } = getBlinkMetrics(result);
       setBlinkDebug({ blinkScore, ear });
+      faceBoxRef.current = getFaceBox(result.faceLandmarks?.[0]);
 
       if (!hasFace) {
         if (faceDetectedRef.current) {
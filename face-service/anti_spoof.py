@@ -7,14 +7,15 @@ photo / screen replay. Uses a lightweight ONNX model (~1MB).
 import logging
 import os
 
-import cv2
 import numpy as np
 
 import config
+import preprocess
 
 logger = logging.getLogger(__name__)
 
 _model = None
+_input_name = None
 _enabled = True
 
 # Default model input size. Overridden automatically from ONNX input tensor shape
@@ -24,7 +25,7 @@ MODEL_INPUT_SIZE = (128, 128)
 
 def load_model():
     """Load the anti-spoofing ONNX model."""
-    global _model, _enabled
+    global _model, _input_name, _enabled
 
     model_path = os.getenv("ANTISPOOF_MODEL_PATH", "")
 
@@ -51,6 +52,7 @@ def load_model():
         import onnxruntime as ort
 
         _model = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        _input_name = _model.get_inputs()[0].name
         # Auto-detect expected input size from ONNX model input shape.
         # Typical shape: [None, 3, H, W]
         try:
@@ -82,6 +84,16 @@ def load_model():
             "Failed to load anti-spoofing model: %s. Spoofing detection disabled.", exc
         )
         _enabled = False
+
+
+def warm_up():
+    """Run one inference on a blank input so the first real check is fast."""
+    if not is_enabled():
+        return
+    w, h = MODEL_INPUT_SIZE
+    blob = np.zeros((1, 3, h, w), dtype=np.float32)
+    _model.run(None, {_input_name: blob})
+    logger.info("Anti-spoofing model warmed up")
 
 
 def is_enabled() -> bool:
@@ -117,40 +129,15 @@ def check_liveness(image: np.ndarray, face_bbox: np.ndarray) -> tuple[bool, floa
         x = int(cx - crop_size / 2)
         y = int(cy - crop_size / 2)
 
-        crop_x1 = max(0, x)
-        crop_y1 = max(0, y)
-        crop_x2 = min(w, x + crop_size)
-        crop_y2 = min(h, y + crop_size)
-
-        top_pad = int(max(0, -y))
-        left_pad = int(max(0, -x))
-        bottom_pad = int(max(0, (y + crop_size) - h))
-        right_pad = int(max(0, (x + crop_size) - w))
-
-        if crop_x2 <= crop_x1 or crop_y2 <= crop_y1:
+        if x + crop_size <= 0 or y + crop_size <= 0 or x >= w or y >= h:
             return True, 1.0
-        crop = image[crop_y1:crop_y2, crop_x1:crop_x2]
-        if top_pad or bottom_pad or left_pad or right_pad:
-            crop = cv2.copyMakeBorder(
-                crop,
-                top_pad,
-                bottom_pad,
-                left_pad,
-                right_pad,
-                cv2.BORDER_REFLECT_101,
-            )
 
-        # Preprocess
-        resized = cv2.resize(crop, MODEL_INPUT_SIZE)
-        # MiniFASNet training/inference pipeline uses RGB ordering.
-        rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
-        blob = rgb.astype(np.float32) / 255.0
-        blob = blob.transpose(2, 0, 1)  # HWC -> CHW
-        blob = np.expand_dims(blob, axis=0)  # Add batch dim
+        # Crop, reflect-pad and resize in one warp, then RGB / 255 into a
+        # reused NCHW buffer (MiniFASNet was trained on RGB input).
+        blob = preprocess.liveness_input(image, x, y, crop_size, MODEL_INPUT_SIZE)
 
         # Run inference
-        input_name = _model.get_inputs()[0].name
-        output = _model.run(None, {input_name: blob})[0]
+        output = _model.run(None, {_input_name: blob})[0]
 
         # Output is usually [batch, N] logits, where N can be 2 or 3.
         # Real/live class index is configurable via ANTISPOOF_REAL_CLASS_INDEX.
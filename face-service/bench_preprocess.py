@@ -0,0 +1,157 @@
+"""Microbenchmark: per-face preprocessing before and after ``preprocess.py``.
+
+Compares the previous liveness and recognition input pipelines (fresh
+crop / pad / resize / colour / float / transpose arrays per face) with
+the buffer-reusing versions, on a synthetic frame.  Only preprocessing is
+timed; no ONNX model is needed.
+
+    python bench_preprocess.py --iterations 2000
+
+For each pipeline it prints the mean time per face and the transient
+memory it allocates per face (tracemalloc peak above baseline), plus the
+largest difference between the old and new tensors.  The liveness
+difference is also checked on squares padded well past the crop or
+mostly outside the frame.
+"""
+
+import argparse
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+from insightface.utils import face_align
+
+import preprocess
+
+LIVENESS_SIZE = (80, 80)
+# buffalo_l recognition model preprocessing (ArcFaceONNX attributes).
+ARCFACE = SimpleNamespace(input_size=(112, 112), input_mean=127.5, input_std=127.5)
+
+
+def _liveness_square(bbox):
+    x1, y1, x2, y2 = [int(v) for v in bbox]
+    cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
+    crop_size = max(1, int(max(x2 - x1, y2 - y1) * 2.7))
+    return int(cx - crop_size / 2), int(cy - crop_size / 2), crop_size
+
+
+def liveness_before(image, bbox):
+    return _liveness_before_square(image, *_liveness_square(bbox))
+
+
+def _liveness_before_square(image, x, y, crop_size):
+    h, w = image.shape[:2]
+    crop = image[max(0, y) : min(h, y + crop_size), max(0, x) : min(w, x + crop_size)]
+    crop = cv2.copyMakeBorder(
+        crop,
+        max(0, -y),
+        max(0, y + crop_size - h),
+        max(0, -x),
+        max(0, x + crop_size - w),
+        cv2.BORDER_REFLECT_101,
+    )
+    resized = cv2.resize(crop, LIVENESS_SIZE)
+    rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+    blob = rgb.astype(np.float32) / 255.0
+    blob = blob.transpose(2, 0, 1)
+    return np.expand_dims(blob, axis=0)
+
+
+def liveness_after(image, bbox):
+    x, y, crop_size = _liveness_square(bbox)
+    return preprocess.liveness_input(image, x, y, crop_size, LIVENESS_SIZE)
+
+
+def _padded_squares(size: int) -> list[tuple[int, int, int]]:
+    """Liveness squares ``(x, y, crop_size)`` reaching far out of the frame."""
+    return [
+        (size - 140, size // 2, size * 5 // 8),  # pad wider than the crop
+        (size - 40, size - 80, size // 3),  # only a corner is visible
+        (-size // 2, -size // 2, size * 5 // 8),  # above and left of the frame
+        (-size // 8, -size // 8, size * 5 // 4),  # larger than the frame
+    ]
+
+
+def arcface_before(image, kps):
+    aligned = face_align.norm_crop(image, landmark=kps, image_size=112)
+    return cv2.dnn.blobFromImages(
+        [aligned],
+        1.0 / ARCFACE.input_std,
+        ARCFACE.input_size,
+        (ARCFACE.input_mean,) * 3,
+        swapRB=True,
+    )
+
+
+def arcface_after(image, kps):
+    matrix = face_align.estimate_norm(kps, ARCFACE.input_size[0])
+    return preprocess.arcface_input(image, matrix, ARCFACE)
+
+
+def _measure(fn, args, iterations: int) -> tuple[float, int]:
+    fn(*args)  # first call allocates the reusable buffers
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn(*args)
+    per_call_s = (time.perf_counter() - started) / iterations
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return per_call_s, peak - baseline
+
+
+def _frame(size: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    small = rng.integers(0, 256, (size // 16, size // 16, 3), dtype=np.uint8)
+    return cv2.resize(small, (size, size), interpolation=cv2.INTER_CUBIC)
+
+
+def main(args):
+    image = _frame(args.frame_size)
+    face = args.face_size
+    x0 = y0 = (args.frame_size - face) // 2
+    # Face near the frame border so the liveness crop needs padding.
+    if args.edge:
+        x0 = 0
+    bbox = np.array([x0, y0, x0 + face, y0 + face], dtype=np.float32)
+    kps = face_align.arcface_dst * (face / 112.0) + np.array([x0, y0], np.float32)
+
+    cases = [
+        ("liveness", liveness_before, liveness_after, (image, bbox)),
+        ("arcface", arcface_before, arcface_after, (image, kps)),
+    ]
+    print(f"{'stage':<10} {'pipeline':<8} {'us/face':>9} {'bytes/face':>11}")
+    for name, before, after, fn_args in cases:
+        diff = float(np.abs(before(*fn_args) - after(*fn_args)).max())
+        for label, fn in (("before", before), ("after", after)):
+            per_call_s, allocated = _measure(fn, fn_args, args.iterations)
+            print(f"{name:<10} {label:<8} {per_call_s * 1e6:>9.1f} {allocated:>11d}")
+        print(f"{name:<10} max |before - after| = {diff:.4f}")
+
+    diff = max(
+        float(
+            np.abs(
+                _liveness_before_square(image, *square)
+                - preprocess.liveness_input(image, *square, LIVENESS_SIZE)
+            ).max()
+        )
+        for square in _padded_squares(args.frame_size)
+    )
+    print(f"{'liveness':<10} max |before - after| with large pads = {diff:.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark face preprocessing")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--frame-size", type=int, default=640)
+    parser.add_argument("--face-size", type=int, default=160)
+    parser.add_argument(
+        "--edge", action="store_true", help="Place the face at the frame edge"
+    )
+    main(parser.parse_args())
@@ -0,0 +1,80 @@
+"""Background change detection for cached station galleries.
+
+Instead of expiring every gallery after a short TTL and re-downloading it,
+a periodic task reads one cheap fingerprint query for all stations and
+reloads only the cached galleries whose fingerprint changed; the same
+query decides when the per-person ``/verify`` galleries are stale.  Changes
+made by the NestJS API (deactivation, station transfer, re-enrolment) are
+therefore picked up within ``CACHE_REFRESH_INTERVAL_S`` without a call to
+``/invalidate-cache``.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+import config
+import database
+import embedding_cache
+
+logger = logging.getLogger(__name__)
+
+_task: Optional[asyncio.Task] = None
+
+
+async def refresh_once() -> list[int]:
+    """Reload cached galleries whose fingerprint changed.
+
+    Per-person /verify galleries are dropped when the global fingerprint
+    changed.  Returns the ids of the stations that were reloaded.
+    """
+    station_ids = embedding_cache.cached_station_ids()
+    if not station_ids and not embedding_cache.has_personnel():
+        return []
+
+    fingerprints = await database.get_station_fingerprints()
+    embedding_cache.check_personnel(fingerprints[0])
+    reloaded: list[int] = []
+    for station_id in station_ids:
+        current = fingerprints.get(station_id, (0, 0, 0))
+        if current == embedding_cache.fingerprint(station_id):
+            continue
+        logger.info("Gallery for station %d changed; reloading", station_id)
+        await embedding_cache.load(station_id, current)
+        reloaded.append(station_id)
+    return reloaded
+
+
+async def _run(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await refresh_once()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("Gallery change check failed: %s", exc)
+
+
+def start(interval: Optional[float] = None):
+    """Start the periodic change check (no-op if disabled or running)."""
+    global _task
+    if interval is None:
+        interval = config.CACHE_REFRESH_INTERVAL_S
+    if interval <= 0 or (_task is not None and not _task.done()):
+        return
+    _task = asyncio.create_task(_run(interval))
+    logger.info("Gallery change checks every %.0fs", interval)
+
+
+async def stop():
+    """Cancel the periodic change check."""
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
@@ -12,12 +12,106 @@ DB_USER = os.getenv("DB_USER", "root")
 DB_PASS = os.getenv("DB_PASS", "")
 DB_NAME = os.getenv("DB_NAME", "bfp_sorsogon_attendance")
 
+# Rows fetched per round trip when streaming a station gallery.
+DB_FETCH_CHUNK_SIZE = int(os.getenv("DB_FETCH_CHUNK_SIZE", "1000"))
+
 # Service
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", "5001"))
 
 # Models
 INSIGHTFACE_MODEL_NAME = os.getenv("INSIGHTFACE_MODEL_NAME", "buffalo_l")
+# Tag written to face_embeddings.model_version and the only version loaded
+# for matching. Keep it on the old model until a re-embedding run finishes.
+EMBEDDING_MODEL_VERSION = os.getenv("EMBEDDING_MODEL_VERSION", INSIGHTFACE_MODEL_NAME)
+# Where /register archives source images for future re-embedding.  Off by
+# default: the archive holds raw face images, so enable it deliberately.
+ENROLMENT_IMAGE_DIR = os.getenv("ENROLMENT_IMAGE_DIR", "")
+
+# Startup
+# Run one synthetic inference per model before reporting ready so the first
+# real request does not pay ONNX Runtime's first-run allocation cost.
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+# Comma-separated station ids whose galleries are loaded into the embedding
+# cache during startup (0 = global gallery). Empty disables prefetching.
+PREFETCH_STATION_IDS = [
+    int(s) for s in os.getenv("PREFETCH_STATION_IDS", "").split(",") if s.strip()
+]
+
+# Inference admission control
+# Jobs allowed to run at once (ONNX Runtime already uses all cores per job).
+INFERENCE_CONCURRENCY = int(os.getenv("INFERENCE_CONCURRENCY", "1"))
+# Jobs allowed to wait; beyond this requests are rejected with 503.
+INFERENCE_QUEUE_DEPTH = int(os.getenv("INFERENCE_QUEUE_DEPTH", "16"))
+# Per-priority-class deadlines in seconds (0 = no deadline), used when the
+# caller does not send X-Request-Timeout-Ms.
+INFERENCE_DEADLINE_RECOGNIZE_S = float(
+    os.getenv("INFERENCE_DEADLINE_RECOGNIZE_S", "10")
+)
+INFERENCE_DEADLINE_REGISTER_S = float(os.getenv("INFERENCE_DEADLINE_REGISTER_S", "60"))
+
+# Inference worker processes
+# 0 runs inference in the API process; N > 0 starts N worker processes.
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0"))
+# ONNX Runtime / OpenCV threads per worker (0 = library default).
+INFERENCE_WORKER_THREADS = int(os.getenv("INFERENCE_WORKER_THREADS", "0"))
+# Pin each worker to its own block of CPUs (Linux only).
+INFERENCE_WORKER_PIN_CPUS = (
+    os.getenv("INFERENCE_WORKER_PIN_CPUS", "false").lower() == "true"
+)
+# Shared-memory slot per worker; larger frames are pickled instead.
+INFERENCE_WORKER_SLOT_BYTES = int(
+    os.getenv("INFERENCE_WORKER_SLOT_BYTES", str(16 * 1024 * 1024))
+)
+
+# Image decoding
+# Large JPEGs are decoded at 1/2, 1/4 or 1/8 scale as long as the long side
+# stays at or above this size (the detector input resolution).
+DECODE_TARGET_SIZE = int(os.getenv("DECODE_TARGET_SIZE", "640"))
+# Faces narrower than this (in decoded pixels) are re-detected on a
+# full-resolution crop so alignment does not upsample a tiny face.
+MIN_ALIGN_FACE_SIZE = int(os.getenv("MIN_ALIGN_FACE_SIZE", "112"))
+# ROI hints on /recognize: the hinted box is grown by this many times its
+# longer side on each edge and detected at no more than ROI_DET_SIZE.
+ROI_EXPANSION = float(os.getenv("ROI_EXPANSION", "0.75"))
+ROI_DET_SIZE = int(os.getenv("ROI_DET_SIZE", "320"))
+# Uploads above these limits are rejected before decoding.
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", str(10 * 1024 * 1024)))
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", "40000000"))
+
+# Gallery compaction
+# Maximum templates kept per person; extra templates are clustered.
+GALLERY_MAX_TEMPLATES = int(os.getenv("GALLERY_MAX_TEMPLATES", "10"))
+# Templates at least this similar to a newer one are dropped as duplicates.
+GALLERY_DEDUP_THRESHOLD = float(os.getenv("GALLERY_DEDUP_THRESHOLD", "0.98"))
+# Compact a person's templates right after each /register call (opt-in;
+# run ``gallery_compaction.py`` offline otherwise).
+GALLERY_COMPACT_ON_REGISTER = (
+    os.getenv("GALLERY_COMPACT_ON_REGISTER", "false").lower() == "true"
+)
+
+# Embedding cache
+# Upper bound on how long a cached gallery is served without a reload.
+EMBEDDING_CACHE_TTL_S = float(os.getenv("EMBEDDING_CACHE_TTL_S", "3600"))
+# How often cached galleries are checked for changes (0 disables checks).
+CACHE_REFRESH_INTERVAL_S = float(os.getenv("CACHE_REFRESH_INTERVAL_S", "15"))
+
+# Per-person galleries cached for /verify.
+PERSON_CACHE_TTL_S = float(os.getenv("PERSON_CACHE_TTL_S", "300"))
+PERSON_CACHE_MAX_ENTRIES = int(os.getenv("PERSON_CACHE_MAX_ENTRIES", "2048"))
+
+# Load-adaptive quality tiers (see quality_tier.py)
+QUALITY_TIERS_ENABLED = os.getenv("QUALITY_TIERS_ENABLED", "false").lower() == "true"
+# Lowest quality tier the controller may step down to (0-3).
+QUALITY_MAX_TIER = int(os.getenv("QUALITY_MAX_TIER", "3"))
+# Detector input size used from tier 1 on.
+QUALITY_DEGRADED_DET_SIZE = int(os.getenv("QUALITY_DEGRADED_DET_SIZE", "320"))
+# Step down when this many jobs are queued or p90 /recognize latency exceeds
+# QUALITY_LATENCY_HIGH_S; step up after QUALITY_RECOVERY_S below half of both.
+QUALITY_QUEUE_HIGH = int(os.getenv("QUALITY_QUEUE_HIGH", "4"))
+QUALITY_LATENCY_HIGH_S = float(os.getenv("QUALITY_LATENCY_HIGH_S", "1.5"))
+QUALITY_RECOVERY_S = float(os.getenv("QUALITY_RECOVERY_S", "15"))
+QUALITY_CHECK_INTERVAL_S = float(os.getenv("QUALITY_CHECK_INTERVAL_S", "1"))
 
 # Face detection quality threshold
 MIN_FACE_DET_SCORE = float(os.getenv("MIN_FACE_DET_SCORE", "0.5"))
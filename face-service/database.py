@@ -72,17 +72,128 @@ async def close_pool():
         logger.info("Database connection pool closed")
 
 
-async def get_embeddings_by_station(station_id: int) -> list[tuple[int, np.ndarray]]:
+class _ChunkDecoder:
+    """Decodes streamed embedding rows into per-dimension matrices.
+
+    Rows of the first dimension seen go into a growing matrix preallocated
+    for the expected row count.  Rows of any other dimension (templates
+    from another model) are rare and are collected separately, so they are
+    kept rather than dropped.
+    """
+
+    def __init__(self, expected_rows: int):
+        self.capacity = max(expected_rows, 1)
+        self.count = 0
+        self.dim: Optional[int] = None
+        self.personnel_ids = np.empty(self.capacity, dtype=np.int32)
+        self.vectors: Optional[np.ndarray] = None
+        # {dim: [(personnel_id, vector), ...]} for dimensions other than dim
+        self.other: dict[int, list[tuple[int, np.ndarray]]] = {}
+
+    def _reserve(self, extra: int):
+        needed = self.count + extra
+        if needed <= self.capacity:
+            return
+        # Only reached when the fingerprint count was stale; grow geometrically.
+        self.capacity = max(needed, self.capacity * 2)
+        self.personnel_ids = np.resize(self.personnel_ids, self.capacity)
+        grown = np.empty((self.capacity, self.dim), dtype=np.float32)
+        grown[: self.count] = self.vectors[: self.count]
+        self.vectors = grown
+
+    def decode(self, rows: list[tuple]):
+        """Parse and L2-normalise *rows* straight into the output arrays.
+
+        Runs in a worker thread so JSON parsing stays off the event loop.
+        """
+        parsed: list[tuple[int, np.ndarray]] = []
+        for personnel_id, embedding_json in rows:
+            try:
+                vec = _parse_embedding(embedding_json)
+            except (json.JSONDecodeError, ValueError, TypeError) as exc:
+                logger.warning(
+                    "Skipping bad face_embeddings row for personnel %s: %s",
+                    personnel_id,
+                    exc,
+                )
+                continue
+            if vec.size == 0:
+                continue
+            if self.dim is None:
+                self.dim = vec.size
+                self.vectors = np.empty((self.capacity, self.dim), dtype=np.float32)
+            if vec.size != self.dim:
+                self.other.setdefault(vec.size, []).append(
+                    (personnel_id, _l2_normalize(vec))
+                )
+                continue
+            parsed.append((personnel_id, vec))
+
+        if not parsed:
+            return
+        self._reserve(len(parsed))
+        start, end = self.count, self.count + len(parsed)
+        block = self.vectors[start:end]
+        for i, (personnel_id, vec) in enumerate(parsed):
+            self.personnel_ids[start + i] = personnel_id
+            block[i] = vec
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        block /= norms
+        self.count = end
+
+    def result(self) -> dict[int, tuple[np.ndarray, np.ndarray]]:
+        """Return ``{dim: (personnel_ids, vectors)}``."""
+        blocks: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        if self.count:
+            blocks[self.dim] = (
+                self.personnel_ids[: self.count],
+                self.vectors[: self.count],
+            )
+        for dim, pairs in self.other.items():
+            logger.warning(
+                "Loaded %d %d-dim embeddings alongside %d-dim ones",
+                len(pairs),
+                dim,
+                self.dim,
+            )
+            blocks[dim] = (
+                np.array([pid for pid, _ in pairs], dtype=np.int32),
+                np.stack([vec for _, vec in pairs]).astype(np.float32),
+            )
+        return blocks
+
+
+async def get_embeddings_by_station(
+    station_id: int,
+    expected_rows: int = 0,
+    chunk_size: Optional[int] = None,
+    model_version: Optional[str] = None,
+) -> dict[int, tuple[np.ndarray, np.ndarray]]:
     """Load all face embeddings for personnel at the given station.
 
-    Returns a list of (personnel_id, embedding_vector) tuples.
+    Rows are streamed with an unbuffered server-side cursor in chunks of
+    *chunk_size*; each chunk is parsed in a worker thread directly into a
+    matrix preallocated for *expected_rows* (e.g. the fingerprint count),
+    so raw rows never accumulate and the event loop is not blocked.
+
+    Only templates produced by *model_version* (default: the active
+    ``EMBEDDING_MODEL_VERSION``) are loaded.
+
+    Returns ``{dim: (personnel_ids, vectors)}``: per embedding dimension,
+    an int32 array and a float32 matrix of L2-normalised embeddings.
     """
-    results: list[tuple[int, np.ndarray]] = []
+    if chunk_size is None:
+        chunk_size = config.DB_FETCH_CHUNK_SIZE
+    if model_version is None:
+        model_version = config.EMBEDDING_MODEL_VERSION
+    decoder = _ChunkDecoder(expected_rows)
 
     async with pool.acquire() as conn:
-        async with conn.cursor() as cur:
+        async with conn.cursor(aiomysql.SSCursor) as cur:
             # 512-dim embeddings from face_embeddings
-            # If station_id is 0, fetch embeddings for all personnel (e.g. Evaluator/Global mode)
+            # If station_id is 0, fetch embeddings for all personnel
+            # (e.g. Evaluator/Global mode)
             if station_id == 0:
                 await cur.execute(
                     """
@@ -90,7 +201,9 @@ async def get_embeddings_by_station(station_id: int) -> list[tuple[int, np.ndarr
                     FROM face_embeddings fe
                     JOIN personnel p ON p.id = fe.personnel_id
                     WHERE p.is_active = 1
-                    """
+                      AND fe.model_version = %s
+                    """,
+                    (model_version,),
                 )
             else:
                 await cur.execute(
@@ -100,42 +213,282 @@ async def get_embeddings_by_station(station_id: int) -> list[tuple[int, np.ndarr
                     JOIN personnel p ON p.id = fe.personnel_id
                     WHERE p.station_id = %s
                       AND p.is_active = 1
+                      AND fe.model_version = %s
+                    """,
+                    (station_id, model_version),
+                )
+            while True:
+                rows = await cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                await asyncio.to_thread(decoder.decode, rows)
+
+    blocks = decoder.result()
+    logger.info(
+        "Loaded %d embeddings for station %d",
+        sum(len(ids) for ids, _ in blocks.values()),
+        station_id,
+    )
+    return blocks
+
+
+async def get_station_fingerprints(
+    model_version: Optional[str] = None,
+) -> dict[int, tuple[int, int, int]]:
+    """Return a cheap change fingerprint of every station's gallery.
+
+    The fingerprint is ``(count, max_id, xor_of_ids)`` over active
+    personnel's ``face_embeddings`` rows.  Registrations, compaction,
+    deactivation and station transfers all change the set of rows a
+    station loads and therefore its fingerprint.  The global gallery is
+    returned under key ``0``.  Only the ``personnel_id`` index is read, not
+    the embedding JSON.
+    """
+    if model_version is None:
+        model_version = config.EMBEDDING_MODEL_VERSION
+    fingerprints: dict[int, tuple[int, int, int]] = {}
+    total_count = total_max = total_xor = 0
+
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT p.station_id, COUNT(*), MAX(fe.id), BIT_XOR(fe.id)
+                FROM face_embeddings fe
+                JOIN personnel p ON p.id = fe.personnel_id
+                WHERE p.is_active = 1
+                  AND fe.model_version = %s
+                GROUP BY p.station_id
+                """,
+                (model_version,),
+            )
+            rows = await cur.fetchall()
+
+    for station_id, count, max_id, xor_ids in rows:
+        fp = (int(count), int(max_id or 0), int(xor_ids or 0))
+        fingerprints[station_id] = fp
+        total_count += fp[0]
+        total_max = max(total_max, fp[1])
+        total_xor ^= fp[2]
+    fingerprints[0] = (total_count, total_max, total_xor)
+    return fingerprints
+
+
+async def get_station_fingerprint(
+    station_id: int,
+    model_version: Optional[str] = None,
+) -> tuple[int, int, int]:
+    """Return the fingerprint of one station's gallery (``0`` = global).
+
+    Same value as ``get_station_fingerprints()[station_id]``, without
+    aggregating every other station.
+    """
+    if model_version is None:
+        model_version = config.EMBEDDING_MODEL_VERSION
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            if station_id == 0:
+                await cur.execute(
+                    """
+                    SELECT COUNT(*), MAX(fe.id), BIT_XOR(fe.id)
+                    FROM face_embeddings fe
+                    JOIN personnel p ON p.id = fe.personnel_id
+                    WHERE p.is_active = 1
+                      AND fe.model_version = %s
+                    """,
+                    (model_version,),
+                )
+            else:
+                await cur.execute(
+                    """
+                    SELECT COUNT(*), MAX(fe.id), BIT_XOR(fe.id)
+                    FROM face_embeddings fe
+                    JOIN personnel p ON p.id = fe.personnel_id
+                    WHERE p.station_id = %s
+                      AND p.is_active = 1
+                      AND fe.model_version = %s
                     """,
-                    (station_id,),
+                    (station_id, model_version),
                 )
+            count, max_id, xor_ids = await cur.fetchone()
+    return int(count or 0), int(max_id or 0), int(xor_ids or 0)
+
+
+async def save_embeddings(
+    personnel_id: int,
+    embeddings: list[np.ndarray],
+    model_version: Optional[str] = None,
+) -> None:
+    """Persist 512-dim embeddings into the ``face_embeddings`` table."""
+    if model_version is None:
+        model_version = config.EMBEDDING_MODEL_VERSION
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            for emb in embeddings:
+                emb_json = json.dumps(emb.tolist())
+                await cur.execute(
+                    """
+                    INSERT INTO face_embeddings
+                        (personnel_id, embedding, model_version, created_at)
+                    VALUES (%s, %s, %s, NOW())
+                    """,
+                    (personnel_id, emb_json, model_version),
+                )
+    logger.info("Saved %d embeddings for personnel %d", len(embeddings), personnel_id)
+
+
+def _parse_embedding(embedding_json) -> np.ndarray:
+    """Parse a ``face_embeddings.embedding`` JSON value into a float32 vector."""
+    raw = (
+        embedding_json
+        if isinstance(embedding_json, str)
+        else json.dumps(embedding_json)
+    )
+    return np.array(json.loads(raw), dtype=np.float32)
+
+
+async def get_embeddings_by_personnel(
+    personnel_id: int,
+    model_version: Optional[str] = None,
+    active_only: bool = False,
+) -> list[tuple[int, np.ndarray]]:
+    """Load all face embeddings of *model_version* for one person.
+
+    With *active_only*, nothing is returned for deactivated personnel.
+
+    Returns a list of (face_embeddings.id, embedding_vector) tuples with
+    L2-normalised vectors, oldest first.
+    """
+    if model_version is None:
+        model_version = config.EMBEDDING_MODEL_VERSION
+    results: list[tuple[int, np.ndarray]] = []
+
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT fe.id, fe.embedding
+                FROM face_embeddings fe
+                JOIN personnel p ON p.id = fe.personnel_id
+                WHERE fe.personnel_id = %s
+                  AND fe.model_version = %s
+                  AND (p.is_active = 1 OR %s = 0)
+                ORDER BY fe.id
+                """,
+                (personnel_id, model_version, int(active_only)),
+            )
             rows = await cur.fetchall()
-            for personnel_id, embedding_json in rows:
+            for row_id, embedding_json in rows:
                 try:
-                    raw = (
-                        embedding_json
-                        if isinstance(embedding_json, str)
-                        else json.dumps(embedding_json)
-                    )
-                    vec = np.array(json.loads(raw), dtype=np.float32)
+                    vec = _parse_embedding(embedding_json)
                     if vec.size > 0:
-                        results.append((personnel_id, _l2_normalize(vec)))
+                        results.append((row_id, _l2_normalize(vec)))
                 except (json.JSONDecodeError, ValueError, TypeError) as exc:
                     logger.warning(
-                        "Skipping bad face_embeddings row for personnel %s: %s",
+                        "Skipping bad face_embeddings row %s for personnel %s: %s",
+                        row_id,
                         personnel_id,
                         exc,
                     )
 
-    logger.info("Loaded %d embeddings for station %d", len(results), station_id)
     return results
 
 
-async def save_embeddings(personnel_id: int, embeddings: list[np.ndarray]) -> None:
-    """Persist 512-dim embeddings into the ``face_embeddings`` table."""
+async def get_personnel_ids_with_embeddings(
+    model_version: Optional[str] = None,
+) -> list[int]:
+    """Return the ids of all personnel with at least one *model_version* embedding."""
+    if model_version is None:
+        model_version = config.EMBEDDING_MODEL_VERSION
     async with pool.acquire() as conn:
         async with conn.cursor() as cur:
-            for emb in embeddings:
-                emb_json = json.dumps(emb.tolist())
+            await cur.execute(
+                """
+                SELECT DISTINCT personnel_id
+                FROM face_embeddings
+                WHERE model_version = %s
+                ORDER BY personnel_id
+                """,
+                (model_version,),
+            )
+            rows = await cur.fetchall()
+    return [row[0] for row in rows]
+
+
+async def replace_embeddings(
+    personnel_id: int,
+    delete_ids: list[int],
+    embeddings: list[np.ndarray],
+    model_version: Optional[str] = None,
+) -> None:
+    """Atomically delete *delete_ids* and insert *embeddings* for a person."""
+    if model_version is None:
+        model_version = config.EMBEDDING_MODEL_VERSION
+    async with pool.acquire() as conn:
+        await conn.begin()
+        try:
+            async with conn.cursor() as cur:
+                if delete_ids:
+                    placeholders = ", ".join(["%s"] * len(delete_ids))
+                    await cur.execute(
+                        f"""
+                        DELETE FROM face_embeddings
+                        WHERE personnel_id = %s AND id IN ({placeholders})
+                        """,
+                        (personnel_id, *delete_ids),
+                    )
+                for emb in embeddings:
+                    await cur.execute(
+                        """
+                        INSERT INTO face_embeddings
+                            (personnel_id, embedding, model_version, created_at)
+                        VALUES (%s, %s, %s, NOW())
+                        """,
+                        (personnel_id, json.dumps(emb.tolist()), model_version),
+                    )
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
+    logger.info(
+        "Replaced %d embeddings with %d for personnel %d",
+        len(delete_ids),
+        len(embeddings),
+        personnel_id,
+    )
+
+
+async def set_embeddings(
+    personnel_id: int,
+    embeddings: list[np.ndarray],
+    model_version: str,
+) -> None:
+    """Atomically replace every *model_version* embedding of a person.
+
+    Used by the re-embedding job so a retried person never ends up with
+    duplicate templates.
+    """
+    async with pool.acquire() as conn:
+        await conn.begin()
+        try:
+            async with conn.cursor() as cur:
                 await cur.execute(
                     """
-                    INSERT INTO face_embeddings (personnel_id, embedding, created_at)
-                    VALUES (%s, %s, NOW())
+                    DELETE FROM face_embeddings
+                    WHERE personnel_id = %s AND model_version = %s
                     """,
-                    (personnel_id, emb_json),
+                    (personnel_id, model_version),
                 )
-    logger.info("Saved %d embeddings for personnel %d", len(embeddings), personnel_id)
+                for emb in embeddings:
+                    await cur.execute(
+                        """
+                        INSERT INTO face_embeddings
+                            (personnel_id, embedding, model_version, created_at)
+                        VALUES (%s, %s, %s, NOW())
+                        """,
+                        (personnel_id, json.dumps(emb.tolist()), model_version),
+                    )
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
@@ -1,47 +1,183 @@
-"""In-memory cache for station embeddings to reduce DB queries."""
+"""In-memory cache for station galleries to reduce DB queries.
 
+Each entry carries the station's change fingerprint at load time (see
+:func:`database.get_station_fingerprints`).  ``cache_refresher`` compares
+it against the database on a schedule and reloads only stations that
+changed, so the TTL is only a safety net.
+
+A second, LRU-bounded cache holds single-person galleries for 1:1
+verification.  The refresher clears it whenever the global fingerprint
+(every active template) changes, so re-enrolment and deactivation reach
+``/verify`` as quickly as ``/recognize``; it is also cleared by any
+invalidation and its TTL is likewise only a safety net.
+"""
+
+import asyncio
 import logging
 import time
+from collections import OrderedDict
 from typing import Optional
 
-import numpy as np
+import config
+import database
+from gallery import Gallery
 
 logger = logging.getLogger(__name__)
 
-# Cache structure: {station_id: (timestamp, embeddings_list)}
-_cache: dict[int, tuple[float, list[tuple[int, np.ndarray]]]] = {}
+Fingerprint = tuple[int, int, int]
+
+# Cache structure: {station_id: (timestamp, fingerprint, gallery)}
+_cache: dict[int, tuple[float, Optional[Fingerprint], Gallery]] = {}
+
+# Cache TTL in seconds. Changes are picked up by fingerprint checks, so this
+# only bounds how long a gallery can live if those checks keep failing.
+CACHE_TTL = config.EMBEDDING_CACHE_TTL_S
 
-# Cache TTL in seconds (default 60s — embeddings don't change often)
-CACHE_TTL = 60.0
+# Per-person cache for /verify: {personnel_id: (timestamp, gallery)}
+_person_cache: "OrderedDict[int, tuple[float, Gallery]]" = OrderedDict()
+PERSON_CACHE_TTL = config.PERSON_CACHE_TTL_S
+PERSON_CACHE_MAX_ENTRIES = config.PERSON_CACHE_MAX_ENTRIES
+# Global fingerprint the per-person entries were last checked against.
+_person_fingerprint: Optional[Fingerprint] = None
+# Bumped whenever per-person entries are dropped, so a load that started
+# before the drop does not put stale templates back.
+_person_generation = 0
 
 
-def get(station_id: int) -> Optional[list[tuple[int, np.ndarray]]]:
-    """Return cached embeddings for station_id, or None if expired/missing."""
+def get(station_id: int) -> Optional[Gallery]:
+    """Return the cached gallery for station_id, or None if expired/missing."""
     entry = _cache.get(station_id)
     if entry is None:
         return None
-    ts, embeddings = entry
+    ts, _, gallery = entry
     if time.time() - ts > CACHE_TTL:
         del _cache[station_id]
         logger.debug("Cache expired for station %d", station_id)
         return None
-    logger.debug(
-        "Cache hit for station %d (%d embeddings)", station_id, len(embeddings)
-    )
-    return embeddings
+    logger.debug("Cache hit for station %d (%d embeddings)", station_id, len(gallery))
+    return gallery
 
 
-def put(station_id: int, embeddings: list[tuple[int, np.ndarray]]):
-    """Store embeddings in cache."""
-    _cache[station_id] = (time.time(), embeddings)
-    logger.debug("Cached %d embeddings for station %d", len(embeddings), station_id)
+def put(
+    station_id: int, gallery: Gallery, fingerprint: Optional[Fingerprint] = None
+):
+    """Store a station gallery in cache along with its load-time fingerprint."""
+    _cache[station_id] = (time.time(), fingerprint, gallery)
+    logger.debug(
+        "Cached %d embeddings for station %d (%d bytes)",
+        len(gallery),
+        station_id,
+        gallery.nbytes,
+    )
 
 
 def invalidate(station_id: Optional[int] = None):
-    """Invalidate cache for a specific station, or all stations if None."""
+    """Invalidate cache for a specific station, or all stations if None.
+
+    Per-person galleries are always cleared: the caller may be reacting to
+    a personnel change (deactivation, transfer) we cannot map to stations.
+    """
+    _clear_personnel()
     if station_id is not None:
         _cache.pop(station_id, None)
         logger.debug("Invalidated cache for station %d", station_id)
     else:
         _cache.clear()
         logger.debug("Invalidated all embedding caches")
+
+
+def fingerprint(station_id: int) -> Optional[Fingerprint]:
+    """Return the fingerprint a cached gallery was loaded with, if any."""
+    entry = _cache.get(station_id)
+    return entry[1] if entry is not None else None
+
+
+def cached_station_ids() -> list[int]:
+    """Return the ids of all stations currently cached."""
+    return list(_cache)
+
+
+async def load(station_id: int, fp: Optional[Fingerprint] = None) -> Gallery:
+    """Load a station gallery from the DB and (re)place it in the cache.
+
+    *fp* is the station's current fingerprint if the caller already has it
+    (``cache_refresher``); otherwise only this station's is queried.  It is
+    read *before* the rows so a change landing during the load is caught
+    by the next refresh rather than missed.
+    """
+    if fp is None:
+        fp = await database.get_station_fingerprint(station_id)
+    blocks = await database.get_embeddings_by_station(
+        station_id, expected_rows=fp[0]
+    )
+    gallery = await asyncio.to_thread(Gallery.from_blocks, blocks)
+    put(station_id, gallery, fp)
+    return gallery
+
+
+async def get_or_load(station_id: int) -> Gallery:
+    """Return the gallery for station_id, loading from the DB on a cache miss."""
+    gallery = get(station_id)
+    if gallery is None:
+        gallery = await load(station_id)
+    return gallery
+
+
+def _clear_personnel(personnel_id: Optional[int] = None):
+    global _person_generation
+    _person_generation += 1
+    if personnel_id is None:
+        _person_cache.clear()
+    else:
+        _person_cache.pop(personnel_id, None)
+
+
+def invalidate_personnel(personnel_id: int):
+    """Drop one person's cached verification gallery."""
+    _clear_personnel(personnel_id)
+
+
+def has_personnel() -> bool:
+    """Return True if any per-person gallery is cached."""
+    return bool(_person_cache)
+
+
+def check_personnel(global_fp: Fingerprint) -> bool:
+    """Clear per-person galleries if *global_fp* differs from the last check.
+
+    Any registration, compaction, deletion or (de)activation changes the
+    global fingerprint.  Which person changed is unknown, so every entry
+    is dropped.  Returns True if the cache was cleared.
+    """
+    global _person_fingerprint
+    if global_fp == _person_fingerprint:
+        return False
+    _person_fingerprint = global_fp
+    cleared = bool(_person_cache)
+    _clear_personnel()
+    if cleared:
+        logger.info("Active templates changed; cleared per-person galleries")
+    return cleared
+
+
+async def get_or_load_personnel(personnel_id: int) -> Gallery:
+    """Return one active person's gallery, loading it on a cache miss."""
+    entry = _person_cache.get(personnel_id)
+    if entry is not None:
+        ts, gallery = entry
+        if time.time() - ts <= PERSON_CACHE_TTL:
+            _person_cache.move_to_end(personnel_id)
+            return gallery
+        del _person_cache[personnel_id]
+
+    generation = _person_generation
+    rows = await database.get_embeddings_by_personnel(personnel_id, active_only=True)
+    gallery = Gallery.from_pairs([(personnel_id, vec) for _, vec in rows])
+    if generation != _person_generation:
+        # Templates changed while loading; serve this result but do not
+        # cache it.
+        return gallery
+    _person_cache[personnel_id] = (time.time(), gallery)
+    while len(_person_cache) > PERSON_CACHE_MAX_ENTRIES:
+        _person_cache.popitem(last=False)
+    return gallery
@@ -0,0 +1,94 @@
+"""On-disk archive of enrolment source images.
+
+``/register`` stores the uploaded images that produced embeddings so that
+templates can be regenerated when the recognition model changes (see
+``reembed.py``).  Archiving is off unless ``ENROLMENT_IMAGE_DIR`` is set, and a
+person's images are deleted when the API removes their templates or the
+person (``POST /delete-enrolment-images``).  Layout::
+
+    {ENROLMENT_IMAGE_DIR}/{personnel_id}/{unix_ms}-{index}.{jpg|png}
+"""
+
+import logging
+import os
+import shutil
+import time
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def is_enabled() -> bool:
+    """Return True if enrolment images are archived."""
+    return bool(config.ENROLMENT_IMAGE_DIR)
+
+
+def _extension(data: bytes) -> str:
+    if data[:2] == b"\xff\xd8":
+        return "jpg"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    return "img"
+
+
+def save(personnel_id: int, images: list[bytes]) -> list[str]:
+    """Write *images* for *personnel_id* and return their paths."""
+    if not is_enabled() or not images:
+        return []
+
+    person_dir = os.path.join(config.ENROLMENT_IMAGE_DIR, str(personnel_id))
+    os.makedirs(person_dir, exist_ok=True)
+    stamp = int(time.time() * 1000)
+    paths: list[str] = []
+    for idx, data in enumerate(images):
+        path = os.path.join(person_dir, f"{stamp}-{idx}.{_extension(data)}")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+        paths.append(path)
+    logger.info(
+        "Archived %d enrolment images for personnel %d", len(paths), personnel_id
+    )
+    return paths
+
+
+def delete(personnel_id: int) -> int:
+    """Remove every archived image of *personnel_id*; return how many."""
+    if not is_enabled():
+        return 0
+    person_dir = os.path.join(config.ENROLMENT_IMAGE_DIR, str(personnel_id))
+    if not os.path.isdir(person_dir):
+        return 0
+    count = len(list_images(personnel_id))
+    shutil.rmtree(person_dir)
+    logger.info(
+        "Deleted %d archived enrolment images of personnel %d", count, personnel_id
+    )
+    return count
+
+
+def list_personnel() -> list[int]:
+    """Return the ids of all personnel with archived images."""
+    if not is_enabled() or not os.path.isdir(config.ENROLMENT_IMAGE_DIR):
+        return []
+    return sorted(
+        int(name)
+        for name in os.listdir(config.ENROLMENT_IMAGE_DIR)
+        if name.isdigit()
+        and os.path.isdir(os.path.join(config.ENROLMENT_IMAGE_DIR, name))
+    )
+
+
+def list_images(personnel_id: int) -> list[str]:
+    """Return the archived image file names of one person, oldest first."""
+    person_dir = os.path.join(config.ENROLMENT_IMAGE_DIR, str(personnel_id))
+    if not os.path.isdir(person_dir):
+        return []
+    return sorted(name for name in os.listdir(person_dir) if not name.endswith(".tmp"))
+
+
+def image_path(personnel_id: int, name: str) -> str:
+    """Return the full path of an archived image."""
+    return os.path.join(config.ENROLMENT_IMAGE_DIR, str(personnel_id), name)
@@ -5,10 +5,17 @@ so we reuse it instead of loading a separate YOLO model.
 """
 
 import logging
+import math
+from typing import Optional
 
 import numpy as np
+from insightface.app.common import Face
+from insightface.utils import face_align
 
 import config
+import preprocess
+import worker_pool
+from utils import DecodedImage
 
 logger = logging.getLogger(__name__)
 
@@ -22,16 +29,49 @@ def set_app(app):
     _app = app
 
 
-def detect_faces(image: np.ndarray) -> list:
+def _get_faces(image: np.ndarray, input_size: Optional[int] = None) -> list:
+    """``FaceAnalysis.get`` with an optional square detector input size.
+
+    Embeddings are computed through :mod:`preprocess`, which reuses this
+    thread's input buffers instead of allocating per face.
+    """
+    size = (input_size, input_size) if input_size else None
+    bboxes, kpss = _app.det_model.detect(
+        image, input_size=size, max_num=0, metric="default"
+    )
+    faces = []
+    for i in range(bboxes.shape[0]):
+        kps = kpss[i] if kpss is not None else None
+        face = Face(bbox=bboxes[i, 0:4], kps=kps, det_score=bboxes[i, 4])
+        for taskname, model in _app.models.items():
+            if taskname == "detection":
+                continue
+            if taskname == "recognition" and kps is not None:
+                matrix = face_align.estimate_norm(kps, model.input_size[0])
+                face.embedding = preprocess.arcface_embedding(image, matrix, model)
+            else:
+                model.get(image, face)
+        faces.append(face)
+    return faces
+
+
+def detect_faces(image: np.ndarray, input_size: Optional[int] = None) -> list:
     """Run face detection + alignment on *image* (BGR).
 
+    *input_size* overrides the detector's square input resolution (a
+    multiple of 32); smaller inputs are faster but miss small faces.
+
     Returns a list of InsightFace ``Face`` objects sorted by bounding-box
     area (largest first).
     """
+    # In worker-pool mode the models live in the worker processes.
+    if worker_pool.is_running():
+        return worker_pool.pool.detect_faces(image, input_size)
+
     if _app is None:
         raise RuntimeError("InsightFace app not initialised")
 
-    faces = _app.get(image)
+    faces = _get_faces(image, input_size)
     if not faces:
         return []
 
@@ -46,7 +86,15 @@ def detect_faces(image: np.ndarray) -> list:
 
 def detect_face(image: np.ndarray):
     """Return the largest detected face with sufficient quality, or ``None``."""
-    faces = detect_faces(image)
+    return select_face(detect_faces(image))
+
+
+def select_face(faces: list):
+    """Return the largest face in *faces* with sufficient quality, or ``None``.
+
+    *faces* must already be sorted largest first, as returned by
+    :func:`detect_faces`.
+    """
     if not faces:
         logger.info("No face detected in image")
         return None
@@ -68,3 +116,146 @@ def detect_face(image: np.ndarray):
         len(quality_faces),
     )
     return quality_faces[0]
+
+
+def detect_faces_decoded(
+    decoded: DecodedImage, input_size: Optional[int] = None
+) -> list:
+    """Run :func:`detect_faces` on a possibly reduced-resolution frame.
+
+    Bounding boxes and keypoints of the returned faces are mapped back to
+    original-image coordinates.
+    """
+    faces = detect_faces(decoded.image, input_size)
+    if decoded.scale > 1:
+        for face in faces:
+            face.bbox = face.bbox * decoded.scale
+            if face.get("kps") is not None:
+                face.kps = face.kps * decoded.scale
+    return faces
+
+
+def _roi_input_size(height: int, width: int, limit: int) -> int:
+    """Detector input for an ROI crop: its own size, capped at *limit*."""
+    side = math.ceil(max(height, width) / 32) * 32
+    return max(32, min(side, limit))
+
+
+def detect_faces_roi(
+    decoded: DecodedImage, roi, input_size: Optional[int] = None
+) -> list:
+    """Run detection only on an expanded crop around *roi*.
+
+    *roi* is ``[x1, y1, x2, y2]`` in original-image pixels, typically the
+    face box returned for the previous frame.  The box is grown by
+    ``ROI_EXPANSION`` times its longer side on every edge and the crop is
+    detected at no more than ``ROI_DET_SIZE`` (or *input_size* if
+    smaller).  Returned faces are in original-image coordinates; an empty
+    list means the caller should fall back to full-frame detection.
+    """
+    x1, y1, x2, y2 = (float(v) / decoded.scale for v in roi)
+    if not all(math.isfinite(v) for v in (x1, y1, x2, y2)):
+        return []
+    # Clamp to the frame before expanding, so that the box and its padding
+    # stay small enough for ``math.ceil`` whatever the hint holds.
+    height, width = decoded.image.shape[:2]
+    x1, y1 = max(x1, 0.0), max(y1, 0.0)
+    x2, y2 = min(x2, float(width)), min(y2, float(height))
+    if not (x2 > x1 and y2 > y1):
+        return []
+    pad = config.ROI_EXPANSION * max(x2 - x1, y2 - y1)
+    cx1, cy1 = max(int(x1 - pad), 0), max(int(y1 - pad), 0)
+    cx2 = min(int(math.ceil(x2 + pad)), width)
+    cy2 = min(int(math.ceil(y2 + pad)), height)
+    if cx2 - cx1 < 32 or cy2 - cy1 < 32:
+        return []
+
+    crop = decoded.image[cy1:cy2, cx1:cx2]
+    limit = min(config.ROI_DET_SIZE, input_size or config.ROI_DET_SIZE)
+    faces = detect_faces(crop, _roi_input_size(cy2 - cy1, cx2 - cx1, limit))
+    offset = np.array([cx1, cy1], dtype=np.float32)
+    for face in faces:
+        face.bbox = (face.bbox + np.tile(offset, 2)) * decoded.scale
+        if face.get("kps") is not None:
+            face.kps = (face.kps + offset) * decoded.scale
+    return faces
+
+
+def refine_face(decoded: DecodedImage, face):
+    """Re-detect *face* on a full-resolution crop if it was decoded too small.
+
+    A face that is narrower than ``MIN_ALIGN_FACE_SIZE`` in the reduced
+    frame would be upsampled during alignment, so its embedding is
+    recomputed from the original pixels around it.  Returns the refined
+    face (original-image coordinates) or *face* unchanged.
+    """
+    if decoded.scale == 1:
+        return face
+
+    bbox = face.bbox
+    decoded_width = (bbox[2] - bbox[0]) / decoded.scale
+    if decoded_width >= config.MIN_ALIGN_FACE_SIZE:
+        return face
+
+    crop, (ox, oy) = decoded.full_resolution_crop(bbox)
+    refined = select_face(detect_faces(crop))
+    if refined is None:
+        logger.debug("Full-resolution refinement found no face; keeping original")
+        return face
+
+    offset = np.array([ox, oy], dtype=np.float32)
+    refined.bbox = refined.bbox + np.tile(offset, 2)
+    if refined.get("kps") is not None:
+        refined.kps = refined.kps + offset
+    logger.debug(
+        "Refined %.0fpx face on full-resolution crop (decode scale 1/%d)",
+        decoded_width,
+        decoded.scale,
+    )
+    return refined
+
+
+def detect_probe_face(
+    decoded: DecodedImage,
+    roi=None,
+    input_size: Optional[int] = None,
+    refine: bool = True,
+):
+    """Detect the best face, refining it at full resolution if too small.
+
+    With an *roi* hint the expanded region around it is tried first and
+    the full frame only if no qualifying face is found there.  *input_size*
+    caps the detector input (see :func:`detect_faces`); ``refine=False``
+    skips the full-resolution re-detection of small faces.
+    """
+    face = None
+    if roi is not None:
+        face = select_face(detect_faces_roi(decoded, roi, input_size))
+        if face is None:
+            logger.info("No face near ROI hint; falling back to full frame")
+    if face is None:
+        face = select_face(detect_faces_decoded(decoded, input_size))
+    if face is None or not refine:
+        return face
+    return refine_face(decoded, face)
+
+
+def detect_enrolment_face(decoded: DecodedImage):
+    """Pick the face to enrol from *decoded*.
+
+    Registration is more tolerant than recognition so users can enroll in
+    suboptimal lighting/angles and still generate embeddings: when no face
+    meets ``MIN_FACE_DET_SCORE`` the largest detected face is used.
+
+    Returns ``(face, used_fallback)``; ``face`` is ``None`` if nothing was
+    detected.
+    """
+    faces = detect_faces_decoded(decoded)
+    face = select_face(faces)
+    used_fallback = False
+    if face is None:
+        if not faces:
+            return None, False
+        face = faces[0]
+        used_fallback = True
+    return refine_face(decoded, face), used_fallback
@@ -1,4 +1,4 @@
-"""Face recognition: embedding generation and comparison.
+"""Face recognition: model loading and embedding extraction.
 
 Uses InsightFace buffalo_l which produces 512-dimensional embeddings.
 """
@@ -16,20 +16,65 @@ logger = logging.getLogger(__name__)
 app: FaceAnalysis | None = None
 
 
-def load_model():
-    """Download (if needed) and initialise the InsightFace model."""
+def _limit_threads(analysis: FaceAnalysis, num_threads: int):
+    """Recreate each model's ONNX session with a fixed thread budget.
+
+    ``FaceAnalysis`` does not forward session options to ONNX Runtime, so
+    the sessions are rebuilt from the same model files.
+    """
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = num_threads
+    options.inter_op_num_threads = 1
+    for model in analysis.models.values():
+        model.session = ort.InferenceSession(
+            model.model_file,
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+
+
+def load_model(num_threads: int = 0):
+    """Download (if needed) and initialise the InsightFace model.
+
+    *num_threads* caps ONNX Runtime's intra-op threads (0 = all cores).
+    """
     global app
     logger.info("Loading InsightFace model '%s' …", config.INSIGHTFACE_MODEL_NAME)
+    # Only detection + recognition are used; skipping the landmark and
+    # gender/age heads shortens startup and per-face inference.
     app = FaceAnalysis(
         name=config.INSIGHTFACE_MODEL_NAME,
+        allowed_modules=["detection", "recognition"],
         providers=["CPUExecutionProvider"],
     )
+    if num_threads > 0:
+        _limit_threads(app, num_threads)
     # det_size controls the input resolution for the detector
     app.prepare(ctx_id=0, det_size=(640, 640))
     face_detector.set_app(app)
     logger.info("InsightFace model loaded successfully")
 
 
+def warm_up():
+    """Run detection and recognition once on synthetic input.
+
+    ONNX Runtime allocates its arenas and picks kernels on the first run,
+    which otherwise lands on the first real request.
+    """
+    if app is None:
+        raise RuntimeError("InsightFace app not initialised")
+
+    # A blank frame exercises the detector but yields no faces, so the
+    # recognition model is warmed up separately on an aligned-size crop.
+    app.get(np.zeros((640, 640, 3), dtype=np.uint8))
+    rec_model = app.models.get("recognition")
+    if rec_model is not None:
+        rec_model.get_feat(np.zeros((112, 112, 3), dtype=np.uint8))
+    logger.info("InsightFace model warmed up")
+
+
 def get_embedding(face) -> np.ndarray:
     """Extract the 512-dim embedding from an InsightFace ``Face`` object.
 
@@ -48,58 +93,6 @@ def get_embedding(face) -> np.ndarray:
     return emb
 
 
-def _cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
-    """Compute cosine similarity between two vectors of any dimension."""
-    norm_a = np.linalg.norm(a)
-    norm_b = np.linalg.norm(b)
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return float(np.dot(a, b) / (norm_a * norm_b))
-
-
-def compare_embeddings(
-    embedding: np.ndarray,
-    stored_embeddings: list[tuple[int, np.ndarray]],
-) -> tuple[int | None, float]:
-    """Compare *embedding* against stored embeddings using centroid averaging.
-
-    Embeddings for the same ``personnel_id`` are grouped and averaged into
-    a single centroid vector before comparison.  This reduces noise from
-    individual registration photos and gives more stable matching.
-
-    Returns ``(personnel_id, confidence)`` of the best match, or
-    ``(None, 0.0)`` when *stored_embeddings* is empty.
-    """
-    if not stored_embeddings:
-        return None, 0.0
-
-    # Group embeddings by personnel_id and compute centroids
-    from collections import defaultdict
-
-    groups: dict[int, list[np.ndarray]] = defaultdict(list)
-    for pid, vec in stored_embeddings:
-        groups[pid].append(vec)
-
-    best_id: int | None = None
-    best_score: float = -1.0
-
-    for pid, vecs in groups.items():
-        same_dim = [v for v in vecs if v.shape[0] == embedding.shape[0]]
-        if not same_dim:
-            continue
-
-        centroid = np.mean(same_dim, axis=0).astype(np.float32)
-        centroid = centroid / (np.linalg.norm(centroid) + 1e-10)
-        person_score = _cosine_similarity(embedding, centroid)
-        if person_score > best_score:
-            best_score = person_score
-            best_id = pid
-
-    # Clamp to [0, 1]
-    best_score = max(0.0, min(1.0, best_score))
-    return best_id, round(best_score, 4)
-
-
 def is_model_loaded() -> bool:
     """Return True if the InsightFace model is ready."""
     return app is not None
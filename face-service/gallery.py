@@ -0,0 +1,130 @@
+"""Compact in-memory station gallery.
+
+Matching only ever compares the probe with one centroid per person (the
+normalised mean of their templates), so that is all a cached gallery
+keeps: per embedding dimension, one contiguous float32 centroid matrix
+and a parallel int32 ``personnel_ids`` array, instead of one
+``np.ndarray`` object per template.
+
+A match is a single exact matrix-vector product over the centroids of the
+probe's dimension and gives the same answer as the former per-person
+``compare_embeddings`` loop: centroids are built only from templates of
+the probe's dimension, the best cosine similarity wins, and the score is
+clamped to [0, 1] and rounded to four decimals.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+
+class Gallery:
+    """Per-person centroids for one station, grouped by embedding dimension."""
+
+    def __init__(
+        self, blocks: dict[int, tuple[np.ndarray, np.ndarray]], templates: int
+    ):
+        # {dim: (personnel_ids, centroids)}, ids sorted ascending.
+        self._blocks = blocks
+        self._templates = templates
+
+    @classmethod
+    def from_blocks(
+        cls, blocks: dict[int, tuple[np.ndarray, np.ndarray]]
+    ) -> "Gallery":
+        """Build a gallery from ``{dim: (personnel_ids, vectors)}``.
+
+        Vectors of different dimensions (e.g. templates from an older model)
+        are kept apart and only ever matched against probes of their own
+        dimension.
+        """
+        centroids = {}
+        templates = 0
+        for dim, (personnel_ids, vectors) in blocks.items():
+            if len(personnel_ids) == 0:
+                continue
+            centroids[dim] = _centroids(
+                np.asarray(personnel_ids, dtype=np.int32),
+                np.asarray(vectors, dtype=np.float32),
+            )
+            templates += len(personnel_ids)
+        return cls(centroids, templates)
+
+    @classmethod
+    def from_arrays(
+        cls, personnel_ids: np.ndarray, vectors: np.ndarray
+    ) -> "Gallery":
+        """Build a gallery from parallel id / vector arrays of one dimension."""
+        if len(personnel_ids) == 0:
+            return cls.empty()
+        return cls.from_blocks({vectors.shape[1]: (personnel_ids, vectors)})
+
+    @classmethod
+    def from_pairs(cls, pairs: list[tuple[int, np.ndarray]]) -> "Gallery":
+        """Build a gallery from ``(personnel_id, vector)`` tuples of any dimension."""
+        by_dim: dict[int, list[tuple[int, np.ndarray]]] = defaultdict(list)
+        for pid, vec in pairs:
+            by_dim[vec.shape[0]].append((pid, vec))
+        return cls.from_blocks(
+            {
+                dim: (
+                    np.array([pid for pid, _ in rows], dtype=np.int32),
+                    np.stack([vec for _, vec in rows]),
+                )
+                for dim, rows in by_dim.items()
+            }
+        )
+
+    @classmethod
+    def empty(cls) -> "Gallery":
+        return cls({}, 0)
+
+    def __len__(self) -> int:
+        """Number of templates the centroids were built from."""
+        return self._templates
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the gallery arrays."""
+        return sum(ids.nbytes + c.nbytes for ids, c in self._blocks.values())
+
+    def match(self, embedding: np.ndarray) -> tuple[int | None, float]:
+        """Return ``(personnel_id, confidence)`` of the best match.
+
+        Returns ``(None, 0.0)`` when nobody has templates of the probe's
+        dimension.
+        """
+        block = self._blocks.get(embedding.shape[0])
+        if block is None:
+            return None, 0.0
+        personnel_ids, centroids = block
+
+        query = np.asarray(embedding, dtype=np.float32)
+        scores = centroids @ query
+        norm = float(np.linalg.norm(query))
+        if norm > 0:
+            scores /= norm
+        best = int(np.argmax(scores))
+        return int(personnel_ids[best]), _clamp(scores[best])
+
+
+def _centroids(
+    personnel_ids: np.ndarray, vectors: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return ``(unique ids, normalised per-id mean vectors)``."""
+    if np.any(personnel_ids[1:] < personnel_ids[:-1]):
+        order = np.argsort(personnel_ids, kind="stable")
+        personnel_ids = personnel_ids[order]
+        vectors = vectors[order]
+
+    ids, starts, counts = np.unique(
+        personnel_ids, return_index=True, return_counts=True
+    )
+    means = np.add.reduceat(vectors, starts, axis=0) / counts[:, None]
+    means /= np.linalg.norm(means, axis=1, keepdims=True) + 1e-10
+    return ids.astype(np.int32), np.ascontiguousarray(means, dtype=np.float32)
+
+
+def _clamp(score) -> float:
+    """Clamp to [0, 1] and round to four decimals."""
+    return round(max(0.0, min(1.0, float(score))), 4)
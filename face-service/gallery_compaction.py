@@ -0,0 +1,224 @@
+"""Per-person gallery compaction for ``face_embeddings``.
+
+Every ``/register`` call appends templates and nothing prunes them, so
+re-enrolments grow the gallery and the cost of each station load and
+match.  Compaction bounds the number of templates per person:
+
+1. near-identical templates (cosine similarity above
+   ``GALLERY_DEDUP_THRESHOLD``) are dropped, newest kept;
+2. if more than ``GALLERY_MAX_TEMPLATES`` remain they are clustered with
+   spherical k-means and each multi-member cluster is replaced by its
+   normalised mean.  Singleton clusters keep their original row.
+
+It runs offline over the whole table, or online after each registration
+when ``GALLERY_COMPACT_ON_REGISTER`` is enabled::
+
+    python gallery_compaction.py [--personnel-id ID ...] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import logging
+from collections import Counter
+
+import numpy as np
+
+import config
+import database
+
+logger = logging.getLogger(__name__)
+
+_KMEANS_MAX_ITER = 25
+
+
+def _dedup(vectors: np.ndarray, threshold: float) -> list[int]:
+    """Return indices of *vectors* kept after near-duplicate removal.
+
+    Vectors are visited newest (last) first so the most recent enrolment of
+    a duplicated pose is the one retained.
+    """
+    kept: list[int] = []
+    for idx in range(len(vectors) - 1, -1, -1):
+        if kept and float(np.max(vectors[kept] @ vectors[idx])) >= threshold:
+            continue
+        kept.append(idx)
+    kept.reverse()
+    return kept
+
+
+def _spherical_kmeans(vectors: np.ndarray, k: int) -> np.ndarray:
+    """Cluster unit *vectors* into *k* groups by cosine similarity.
+
+    Uses deterministic farthest-point initialisation so repeated runs over
+    the same templates give the same result.  Returns cluster labels.
+    """
+    sims = vectors @ vectors.T
+    centers_idx = [int(np.argmax(sims.mean(axis=1)))]
+    while len(centers_idx) < k:
+        closest = np.max(sims[:, centers_idx], axis=1)
+        closest[centers_idx] = np.inf
+        centers_idx.append(int(np.argmin(closest)))
+    centers = vectors[centers_idx].copy()
+
+    labels = np.full(len(vectors), -1)
+    for _ in range(_KMEANS_MAX_ITER):
+        new_labels = np.argmax(vectors @ centers.T, axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for j in range(k):
+            members = vectors[labels == j]
+            if len(members) == 0:
+                continue
+            mean = members.mean(axis=0)
+            centers[j] = mean / (np.linalg.norm(mean) + 1e-10)
+    return labels
+
+
+def compact_templates(
+    vectors: np.ndarray,
+    max_templates: int,
+    dedup_threshold: float,
+) -> tuple[list[int], list[np.ndarray]]:
+    """Compact one person's L2-normalised templates.
+
+    Returns ``(keep, new)`` where *keep* are indices into *vectors* to
+    retain unchanged and *new* are representative vectors to insert.
+    """
+    kept = _dedup(vectors, dedup_threshold)
+    if len(kept) <= max_templates:
+        return kept, []
+
+    subset = vectors[kept]
+    labels = _spherical_kmeans(subset, max_templates)
+
+    keep: list[int] = []
+    new: list[np.ndarray] = []
+    for j in range(max_templates):
+        members = np.flatnonzero(labels == j)
+        if len(members) == 0:
+            continue
+        if len(members) == 1:
+            keep.append(kept[members[0]])
+            continue
+        mean = subset[members].mean(axis=0)
+        new.append((mean / (np.linalg.norm(mean) + 1e-10)).astype(np.float32))
+    keep.sort()
+    return keep, new
+
+
+async def compact_personnel(
+    personnel_id: int,
+    max_templates: int | None = None,
+    dedup_threshold: float | None = None,
+    dry_run: bool = False,
+    model_version: str | None = None,
+) -> tuple[int, int]:
+    """Compact the stored *model_version* templates of one person.
+
+    Returns ``(before, after)`` template counts.  Templates whose dimension
+    differs from the person's majority dimension are left untouched.
+    """
+    if max_templates is None:
+        max_templates = config.GALLERY_MAX_TEMPLATES
+    if dedup_threshold is None:
+        dedup_threshold = config.GALLERY_DEDUP_THRESHOLD
+
+    rows = await database.get_embeddings_by_personnel(personnel_id, model_version)
+    if len(rows) <= 1:
+        return len(rows), len(rows)
+
+    dim = Counter(vec.shape[0] for _, vec in rows).most_common(1)[0][0]
+    rows = [(row_id, vec) for row_id, vec in rows if vec.shape[0] == dim]
+    ids = [row_id for row_id, _ in rows]
+    vectors = np.stack([vec for _, vec in rows]).astype(np.float32)
+
+    keep, new = await asyncio.to_thread(
+        compact_templates, vectors, max_templates, dedup_threshold
+    )
+    after = len(keep) + len(new)
+    if after == len(ids):
+        return len(ids), after
+
+    keep_ids = {ids[i] for i in keep}
+    delete_ids = [row_id for row_id in ids if row_id not in keep_ids]
+    logger.info(
+        "Compacting personnel %d: %d -> %d templates%s",
+        personnel_id,
+        len(ids),
+        after,
+        " (dry run)" if dry_run else "",
+    )
+    if not dry_run:
+        await database.replace_embeddings(personnel_id, delete_ids, new, model_version)
+    return len(ids), after
+
+
+async def compact_all(
+    personnel_ids: list[int] | None = None,
+    max_templates: int | None = None,
+    dedup_threshold: float | None = None,
+    dry_run: bool = False,
+    model_version: str | None = None,
+) -> tuple[int, int]:
+    """Compact every person in *personnel_ids* (default: the whole table).
+
+    Returns total ``(before, after)`` template counts.
+    """
+    if not personnel_ids:
+        personnel_ids = await database.get_personnel_ids_with_embeddings(model_version)
+
+    total_before = total_after = 0
+    for personnel_id in personnel_ids:
+        try:
+            before, after = await compact_personnel(
+                personnel_id, max_templates, dedup_threshold, dry_run, model_version
+            )
+        except Exception as exc:
+            logger.error("Compaction failed for personnel %d: %s", personnel_id, exc)
+            continue
+        total_before += before
+        total_after += after
+    return total_before, total_after
+
+
+async def _main(args: argparse.Namespace):
+    await database.create_pool()
+    try:
+        before, after = await compact_all(
+            args.personnel_id,
+            args.max_templates,
+            args.dedup_threshold,
+            args.dry_run,
+            args.model_version,
+        )
+        logger.info("Gallery compaction done: %d -> %d templates", before, after)
+    finally:
+        await database.close_pool()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    )
+    parser = argparse.ArgumentParser(
+        description="Compact face_embeddings per person"
+    )
+    parser.add_argument(
+        "--personnel-id",
+        type=int,
+        action="append",
+        help="Only compact these personnel",
+    )
+    parser.add_argument("--max-templates", type=int, default=None)
+    parser.add_argument("--dedup-threshold", type=float, default=None)
+    parser.add_argument(
+        "--model-version",
+        default=None,
+        help="Templates to compact (default: EMBEDDING_MODEL_VERSION)",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report changes without writing"
+    )
+    asyncio.run(_main(parser.parse_args()))
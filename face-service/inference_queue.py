@@ -0,0 +1,208 @@
+"""Bounded priority queue with admission control for inference work.
+
+Detection and embedding are CPU-bound and run in worker threads.  Without a
+bound, a burst of large ``/register`` calls can starve ``/recognize``
+traffic from the door kiosks, so every inference job goes through this
+queue:
+
+- at most ``INFERENCE_CONCURRENCY`` jobs run at once;
+- waiting jobs are ordered by priority class, then arrival order;
+- at most ``INFERENCE_QUEUE_DEPTH`` jobs may wait.  When full, a new job
+  evicts the newest job of a strictly lower priority class, otherwise it
+  is rejected immediately with :class:`QueueFullError`;
+- jobs whose deadline passed while waiting are dropped with
+  :class:`DeadlineExceededError` instead of being run for a caller that has
+  already given up.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from typing import Any, Callable, Mapping, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Priority classes — lower value is served first.
+PRIORITY_RECOGNIZE = 0
+PRIORITY_REGISTER = 1
+
+_DEFAULT_DEADLINES = {
+    PRIORITY_RECOGNIZE: config.INFERENCE_DEADLINE_RECOGNIZE_S,
+    PRIORITY_REGISTER: config.INFERENCE_DEADLINE_REGISTER_S,
+}
+
+# Header a caller may send with its own time budget (the NestJS API sends
+# its HTTP client timeout).
+TIMEOUT_HEADER = "x-request-timeout-ms"
+
+
+class QueueFullError(Exception):
+    """Raised when the queue is saturated and the job was not admitted."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Inference queue is full")
+        self.retry_after = retry_after
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a job's deadline passed before it could start."""
+
+
+class _Job:
+    __slots__ = ("priority", "seq", "fn", "args", "deadline", "future")
+
+    def __init__(self, priority, seq, fn, args, deadline, future):
+        self.priority = priority
+        self.seq = seq
+        self.fn = fn
+        self.args = args
+        self.deadline = deadline
+        self.future = future
+
+    def __lt__(self, other: "_Job") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class InferenceQueue:
+    """Priority-ordered, depth-bounded dispatcher for blocking callables."""
+
+    def __init__(self, max_depth: int, concurrency: int):
+        self.max_depth = max(0, max_depth)
+        self.concurrency = max(1, concurrency)
+        self._heap: list[_Job] = []
+        self._seq = itertools.count()
+        self._running = 0
+        # Exponentially weighted mean of job run time, used for Retry-After.
+        self._avg_service_s = 0.5
+        self._rejected = 0
+        self._expired = 0
+
+    async def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        priority: int = PRIORITY_RECOGNIZE,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """Run ``fn(*args)`` in a worker thread once admitted and scheduled.
+
+        *deadline* is an absolute ``time.monotonic()`` value.
+        """
+        if deadline is not None and time.monotonic() >= deadline:
+            self._expired += 1
+            raise DeadlineExceededError("Deadline passed before submission")
+
+        if len(self._heap) >= self.max_depth and self._running >= self.concurrency:
+            self._make_room(priority)
+
+        future = asyncio.get_running_loop().create_future()
+        job = _Job(priority, next(self._seq), fn, args, deadline, future)
+        heapq.heappush(self._heap, job)
+        self._dispatch()
+        return await future
+
+    def _make_room(self, priority: int):
+        """Evict the least urgent waiting job, or reject the incoming one."""
+        victim = max(self._heap) if self._heap else None
+        if victim is None or victim.priority <= priority:
+            self._rejected += 1
+            raise QueueFullError(self.retry_after())
+
+        self._heap.remove(victim)
+        heapq.heapify(self._heap)
+        self._rejected += 1
+        if not victim.future.done():
+            victim.future.set_exception(QueueFullError(self.retry_after()))
+        logger.info(
+            "Inference queue full: evicted priority %d job for priority %d",
+            victim.priority,
+            priority,
+        )
+
+    def _dispatch(self):
+        """Start waiting jobs while there is spare concurrency."""
+        while self._heap and self._running < self.concurrency:
+            job = heapq.heappop(self._heap)
+            if job.future.done():
+                # Caller went away (cancelled) while waiting.
+                continue
+            if job.deadline is not None and time.monotonic() >= job.deadline:
+                self._expired += 1
+                job.future.set_exception(
+                    DeadlineExceededError("Deadline passed while queued")
+                )
+                continue
+            self._running += 1
+            asyncio.create_task(self._run(job))
+
+    async def _run(self, job: _Job):
+        started = time.monotonic()
+        try:
+            result = await asyncio.to_thread(job.fn, *job.args)
+        except Exception as exc:
+            if not job.future.done():
+                job.future.set_exception(exc)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            elapsed = time.monotonic() - started
+            self._avg_service_s = 0.8 * self._avg_service_s + 0.2 * elapsed
+            self._running -= 1
+            self._dispatch()
+
+    def retry_after(self) -> int:
+        """Seconds a rejected caller should wait before retrying."""
+        backlog = len(self._heap) + self._running
+        estimate = math.ceil(backlog * self._avg_service_s / self.concurrency)
+        return max(1, min(30, estimate))
+
+    def depth(self) -> int:
+        """Number of jobs waiting to start."""
+        return len(self._heap)
+
+    def stats(self) -> dict:
+        """Snapshot of queue counters for health reporting."""
+        return {
+            "queued": len(self._heap),
+            "running": self._running,
+            "max_depth": self.max_depth,
+            "concurrency": self.concurrency,
+            "avg_service_ms": round(self._avg_service_s * 1000.0, 1),
+            "rejected": self._rejected,
+            "expired": self._expired,
+        }
+
+
+def deadline_for(priority: int, headers: Optional[Mapping[str, str]] = None):
+    """Return the absolute deadline for a job of *priority*.
+
+    A caller that sends ``X-Request-Timeout-Ms`` knows how long it will
+    wait, so that budget replaces the class default; callers without the
+    header get ``INFERENCE_DEADLINE_*_S``.  Returns ``None`` for no deadline.
+    """
+    budget = _DEFAULT_DEADLINES.get(priority, 0.0)
+    if headers is not None:
+        raw = headers.get(TIMEOUT_HEADER)
+        if raw:
+            try:
+                caller_budget = float(raw) / 1000.0
+            except ValueError:
+                logger.debug("Ignoring malformed %s header: %r", TIMEOUT_HEADER, raw)
+            else:
+                if caller_budget > 0 and math.isfinite(caller_budget):
+                    budget = caller_budget
+    if budget <= 0:
+        return None
+    return time.monotonic() + budget
+
+
+queue = InferenceQueue(
+    max_depth=config.INFERENCE_QUEUE_DEPTH,
+    concurrency=config.INFERENCE_CONCURRENCY,
+)
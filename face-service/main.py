@@ -4,20 +4,31 @@ FastAPI application that provides face detection, recognition, and
 registration endpoints consumed by the NestJS API.
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
 import uvicorn
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 import config
 import database
 import anti_spoof
+import cache_refresher
+import embedding_cache
 import face_recognizer
+import inference_queue
+import quality_tier
+import readiness
+import response_encoding
+import worker_pool
 from routes.health import router as health_router
 from routes.recognize import router as recognize_router
 from routes.register import router as register_router
+from routes.verify import router as verify_router
+from routes.delete_enrolment_images import router as delete_enrolment_images_router
 from routes.invalidate_cache import router as invalidate_cache_router
 
 logging.basicConfig(
@@ -27,21 +38,74 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+async def _prefetch_galleries():
+    """Load configured station galleries into the embedding cache."""
+    for station_id in config.PREFETCH_STATION_IDS:
+        try:
+            await embedding_cache.get_or_load(station_id)
+        except Exception as exc:
+            logger.warning(
+                "Gallery prefetch failed for station %d: %s", station_id, exc
+            )
+
+
+async def _startup():
+    """Load models and the DB pool concurrently, warm up, then mark ready."""
+    try:
+        # Model loading is blocking, so it runs in worker threads while the
+        # DB pool is created on the event loop.  In worker-pool mode the
+        # InsightFace models are loaded (and warmed up) by the workers.
+        if config.INFERENCE_WORKERS > 0:
+            load_recognizer = asyncio.to_thread(worker_pool.start)
+        else:
+            load_recognizer = asyncio.to_thread(face_recognizer.load_model)
+        await asyncio.gather(
+            load_recognizer,
+            asyncio.to_thread(anti_spoof.load_model),
+            database.create_pool(),
+        )
+
+        if worker_pool.is_running():
+            queue = inference_queue.queue
+            queue.concurrency = max(queue.concurrency, worker_pool.pool.size())
+        elif config.WARMUP_ENABLED:
+            await asyncio.to_thread(face_recognizer.warm_up)
+        if config.WARMUP_ENABLED:
+            await asyncio.to_thread(anti_spoof.warm_up)
+
+        await _prefetch_galleries()
+        cache_refresher.start()
+        quality_tier.start()
+        readiness.mark_ready()
+    except Exception as exc:
+        logger.exception("face-service startup failed: %s", exc)
+        readiness.mark_failed(exc)
+        readiness.request_shutdown()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Startup / shutdown lifecycle hook."""
-    logger.info("Starting face-service on %s:%s", config.HOST, config.PORT)
+    """Startup / shutdown lifecycle hook.
 
-    # Load ML models (synchronous but only runs once)
-    face_recognizer.load_model()
-    anti_spoof.load_model()
+    Startup work runs in the background so ``/health/live`` answers while
+    models load; ``/health/ready`` only succeeds once it has finished.
+    """
+    logger.info("Starting face-service on %s:%s", config.HOST, config.PORT)
 
-    # Create DB pool
-    await database.create_pool()
+    startup_task = asyncio.create_task(_startup())
 
     yield
 
     # Shutdown
+    if not startup_task.done():
+        startup_task.cancel()
+        try:
+            await startup_task
+        except asyncio.CancelledError:
+            pass
+    await cache_refresher.stop()
+    await quality_tier.stop()
+    await asyncio.to_thread(worker_pool.stop)
     await database.close_pool()
     logger.info("face-service stopped")
 
@@ -50,6 +114,7 @@ app = FastAPI(
     title="BFP Face Recognition Service",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=response_encoding.DefaultJSONResponse,
 )
 
 # CORS — allow all origins for internal service communication
@@ -72,9 +137,7 @@ async def check_shared_secret(request: Request, call_next):
     secret = request.headers.get("x-face-service-secret")
     if secret:
         logger.debug("Received shared secret header")
-    elif ENFORCE_SECRET and request.url.path != "/health":
-        from fastapi.responses import JSONResponse
-
+    elif ENFORCE_SECRET and not request.url.path.startswith("/health"):
         return JSONResponse(
             status_code=401,
             content={"detail": "Missing shared secret"},
@@ -82,10 +145,48 @@ async def check_shared_secret(request: Request, call_next):
     return await call_next(request)
 
 
+@app.middleware("http")
+async def reject_until_ready(request: Request, call_next):
+    """Answer 503 for non-health routes until startup has completed."""
+    if not readiness.is_ready() and not request.url.path.startswith("/health"):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Service is starting"},
+            headers={"Retry-After": "5"},
+        )
+    return await call_next(request)
+
+
+@app.exception_handler(inference_queue.QueueFullError)
+async def queue_full_handler(request: Request, exc: inference_queue.QueueFullError):
+    """Shed load quickly instead of letting callers wait on a full queue."""
+    logger.warning("Rejected %s: inference queue full", request.url.path)
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Face service is busy, retry later"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(inference_queue.DeadlineExceededError)
+async def deadline_exceeded_handler(
+    request: Request, exc: inference_queue.DeadlineExceededError
+):
+    """Report work dropped because its caller's deadline had already passed."""
+    logger.warning("Dropped %s: %s", request.url.path, exc)
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Inference deadline exceeded"},
+        headers={"Retry-After": str(inference_queue.queue.retry_after())},
+    )
+
+
 # Register routers
 app.include_router(health_router)
 app.include_router(recognize_router)
 app.include_router(register_router)
+app.include_router(verify_router)
+app.include_router(delete_enrolment_images_router)
 app.include_router(invalidate_cache_router)
 
 
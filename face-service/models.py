@@ -1,12 +1,27 @@
 """Pydantic request/response models matching the NestJS API contract."""
 
+import math
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 
 
 class RecognizeRequest(BaseModel):
     image: str
     station_id: int
+    # Face box [x1, y1, x2, y2] from the previous frame, in image pixels.
+    roi: Optional[list[float]] = Field(default=None, min_length=4, max_length=4)
+
+    @field_validator("roi")
+    @classmethod
+    def _check_roi(cls, roi: Optional[list[float]]) -> Optional[list[float]]:
+        if roi is None:
+            return roi
+        if not all(math.isfinite(v) for v in roi):
+            raise ValueError("roi values must be finite")
+        x1, y1, x2, y2 = roi
+        if x2 <= x1 or y2 <= y1:
+            raise ValueError("roi must satisfy x2 > x1 and y2 > y1")
+        return roi
 
 
 class RecognizeResponse(BaseModel):
@@ -14,6 +29,20 @@ class RecognizeResponse(BaseModel):
     personnel_id: Optional[int] = None
     confidence: float
     message: str
+    # Detected face box, to be sent back as the next frame's ``roi``.
+    bbox: Optional[list[float]] = None
+
+
+class VerifyRequest(BaseModel):
+    image: str
+    personnel_id: int
+
+
+class VerifyResponse(BaseModel):
+    success: bool
+    personnel_id: int
+    confidence: float
+    message: str
 
 
 class RegisterRequest(BaseModel):
@@ -26,8 +55,40 @@ class RegisterResponse(BaseModel):
     embeddings: list[list[float]]
 
 
+class CompactRegisterResponse(BaseModel):
+    success: bool
+    dtype: str
+    dim: int
+    # Base64 of each embedding's little-endian ``dtype`` values.
+    embeddings: list[str]
+
+
 class HealthResponse(BaseModel):
     status: str
     face_detection: str
     face_recognition: str
     anti_spoofing: str = "disabled"
+    ready: bool = False
+    quality_tier: int = 0
+
+
+class ProbeResponse(BaseModel):
+    status: str
+    detail: Optional[str] = None
+
+
+class WorkerStats(BaseModel):
+    index: int
+    pid: Optional[int] = None
+    alive: bool
+    # Set once a worker failed to restart; it is never handed jobs again.
+    retired: bool = False
+    cpus: Optional[list[int]] = None
+    jobs: int
+    busy_s: float
+    utilisation: float
+
+
+class WorkersResponse(BaseModel):
+    mode: str
+    workers: list[WorkerStats]
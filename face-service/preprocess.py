@@ -0,0 +1,154 @@
+"""Allocation-free preprocessing into reusable NCHW float32 model inputs.
+
+The liveness and embedding stages both turn a region of a BGR frame into
+a ``(1, 3, H, W)`` float32 tensor.  Done with ``copyMakeBorder`` /
+``resize`` / ``cvtColor`` / ``astype`` / ``transpose`` that is half a
+dozen temporary arrays per face.  Here the geometric part (crop, border
+padding, resize or alignment) is a single ``cv2.warpAffine`` into a
+preallocated uint8 image, and the colour swap, mean/std normalisation and
+HWC→CHW transpose are fused into one ``blobFromImageWithParams`` call
+writing straight into a preallocated input tensor.
+
+Buffers are per thread, so each inference-queue thread and each worker
+process (see ``worker_pool.py``) reuses its own set across requests.
+Returned tensors are only valid until the same thread prepares the next
+input of that kind.
+"""
+
+import threading
+
+import cv2
+import numpy as np
+
+_local = threading.local()
+# Image2BlobParams per (size, mean, std); read-only once built.
+_params: dict = {}
+
+
+def buffer(key: str, shape: tuple, dtype=np.float32) -> np.ndarray:
+    """Return this thread's reusable array for *key*.
+
+    The array is reallocated only when *shape* or *dtype* changes (e.g. a
+    model with a different input size was loaded).  Its contents are
+    undefined.
+    """
+    buffers = _local.__dict__.setdefault("buffers", {})
+    buf = buffers.get(key)
+    if buf is None or buf.shape != shape or buf.dtype != dtype:
+        buf = np.empty(shape, dtype=dtype)
+        buffers[key] = buf
+    return buf
+
+
+def warp_into(
+    image: np.ndarray,
+    matrix: np.ndarray,
+    out: np.ndarray,
+    border_mode: int = cv2.BORDER_CONSTANT,
+) -> np.ndarray:
+    """Warp *image* by the 2x3 affine *matrix* into the uint8 HWC *out*."""
+    cv2.warpAffine(
+        image,
+        matrix,
+        (out.shape[1], out.shape[0]),
+        dst=out,
+        flags=cv2.INTER_LINEAR,
+        borderMode=border_mode,
+        borderValue=0,
+    )
+    return out
+
+
+def _blob_params(size: tuple, mean: float, std: float) -> "cv2.dnn.Image2BlobParams":
+    key = (size, mean, std)
+    params = _params.get(key)
+    if params is None:
+        params = cv2.dnn.Image2BlobParams()
+        params.size = size
+        params.scalefactor = (1.0 / std,) * 3
+        params.mean = (mean,) * 3
+        params.swapRB = True
+        params.ddepth = cv2.CV_32F
+        _params[key] = params
+    return params
+
+
+def normalize_into(
+    bgr: np.ndarray, blob: np.ndarray, mean: float, std: float
+) -> np.ndarray:
+    """Write ``(rgb - mean) / std`` of uint8 HWC *bgr* into NCHW *blob*.
+
+    The BGR→RGB swap, scaling and HWC→CHW transpose happen in one pass
+    (``blobFromImageWithParams``) straight into *blob*, whose spatial size
+    must match *bgr*.
+    """
+    params = _blob_params((bgr.shape[1], bgr.shape[0]), mean, std)
+    cv2.dnn.blobFromImageWithParams(bgr, blob, params)
+    return blob
+
+
+def square_crop_matrix(x: int, y: int, crop_size: int, out_w: int, out_h: int):
+    """Affine matrix equal to cropping the square at (*x*, *y*) and resizing.
+
+    Uses the same pixel-centre convention as ``cv2.resize``, so pixels
+    outside the frame are filled by the warp's border mode instead of a
+    padded copy.
+    """
+    sx = out_w / crop_size
+    sy = out_h / crop_size
+    return np.array(
+        [
+            [sx, 0.0, sx * (0.5 - x) - 0.5],
+            [0.0, sy, sy * (0.5 - y) - 0.5],
+        ],
+        dtype=np.float64,
+    )
+
+
+def liveness_input(
+    image: np.ndarray, x: int, y: int, crop_size: int, size: tuple[int, int]
+) -> np.ndarray:
+    """Anti-spoof input: square crop, reflect-padded, resized, RGB / 255.
+
+    *size* is the model input ``(width, height)``.  The square must
+    overlap the frame.  The warp reads from a view of the in-frame part
+    of the square, so the border mode reflects about the crop edges like
+    the former crop / ``copyMakeBorder`` / ``resize`` path (which it
+    matches to within one grey level), not about the frame edges.
+    """
+    h_img, w_img = image.shape[:2]
+    x0, y0 = max(0, x), max(0, y)
+    visible = image[y0 : min(h_img, y + crop_size), x0 : min(w_img, x + crop_size)]
+    w, h = size
+    crop = buffer("liveness_crop", (h, w, 3), np.uint8)
+    warp_into(
+        visible,
+        square_crop_matrix(x - x0, y - y0, crop_size, w, h),
+        crop,
+        border_mode=cv2.BORDER_REFLECT_101,
+    )
+    blob = buffer("liveness_blob", (1, 3, h, w))
+    return normalize_into(crop, blob, 0.0, 255.0)
+
+
+def arcface_input(image: np.ndarray, matrix: np.ndarray, model) -> np.ndarray:
+    """Recognition input for a face aligned by the 2x3 *matrix*.
+
+    *matrix* is ``face_align.estimate_norm(kps, model.input_size[0])``;
+    the result matches ``face_align.norm_crop`` followed by the model's
+    ``cv2.dnn.blobFromImages`` preprocessing.
+    """
+    size = model.input_size[0]
+    aligned = buffer("arcface_crop", (size, size, 3), np.uint8)
+    warp_into(image, matrix, aligned)
+    blob = buffer("arcface_blob", (1, 3, size, size))
+    return normalize_into(aligned, blob, model.input_mean, model.input_std)
+
+
+def arcface_embedding(image: np.ndarray, matrix: np.ndarray, model) -> np.ndarray:
+    """Raw (un-normalised) embedding of one face from an ``ArcFaceONNX``.
+
+    *matrix* is the alignment matrix, as for :func:`arcface_input`.
+    """
+    blob = arcface_input(image, matrix, model)
+    return model.session.run(model.output_names, {model.input_name: blob})[0][0]
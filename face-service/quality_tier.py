@@ -0,0 +1,190 @@
+"""Load-adaptive quality tiers for /recognize.
+
+Under overload a slightly less strict answer at the door beats a
+timeout.  A periodic controller watches the inference queue depth and
+the recent /recognize latency and steps the pipeline down one tier at a
+time while either is above its limit:
+
+====  ==============================  ========  ==========================
+Tier  Detector input                  Liveness  Small-face refinement
+====  ==============================  ========  ==========================
+0     model default (640)             yes       full-resolution re-detect
+1     ``QUALITY_DEGRADED_DET_SIZE``   yes       full-resolution re-detect
+2     ``QUALITY_DEGRADED_DET_SIZE``   skipped   full-resolution re-detect
+3     ``QUALITY_DEGRADED_DET_SIZE``   skipped   skipped
+====  ==============================  ========  ==========================
+
+Each tier drops one more piece of per-request inference; matching is
+the same exact gallery scan at every tier.
+
+Once both signals stay below half their limits for
+``QUALITY_RECOVERY_S`` it steps back up, one tier per recovery period.
+Tier changes are logged and the current tier is reported on ``/health``.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+import config
+import inference_queue
+
+logger = logging.getLogger(__name__)
+
+MAX_TIER = 3
+
+
+class Tier:
+    """What the recognition pipeline may do at one quality level."""
+
+    __slots__ = ("level", "det_size", "liveness", "refine")
+
+    def __init__(
+        self, level: int, det_size: Optional[int], liveness: bool, refine: bool
+    ):
+        self.level = level
+        self.det_size = det_size
+        self.liveness = liveness
+        self.refine = refine
+
+
+def _build_tiers(det_size: int) -> list[Tier]:
+    return [
+        Tier(0, None, liveness=True, refine=True),
+        Tier(1, det_size, liveness=True, refine=True),
+        Tier(2, det_size, liveness=False, refine=True),
+        Tier(3, det_size, liveness=False, refine=False),
+    ]
+
+
+class TierController:
+    """Hysteresis controller choosing the current :class:`Tier`."""
+
+    def __init__(
+        self,
+        max_tier: int,
+        queue_high: int,
+        latency_high_s: float,
+        recovery_s: float,
+        det_size: int,
+    ):
+        self.tiers = _build_tiers(det_size)
+        self.max_tier = max(0, min(max_tier, MAX_TIER))
+        self.queue_high = queue_high
+        self.latency_high_s = latency_high_s
+        self.recovery_s = recovery_s
+        self._level = 0
+        self._latencies: deque[float] = deque(maxlen=256)
+        self._calm_since: Optional[float] = None
+        self._last_p90_s = 0.0
+
+    @property
+    def level(self) -> int:
+        return self._level
+
+    def current(self) -> Tier:
+        return self.tiers[self._level]
+
+    def record_latency(self, seconds: float):
+        """Record one /recognize request's end-to-end latency."""
+        self._latencies.append(seconds)
+
+    def evaluate(self, depth: int, now: Optional[float] = None) -> int:
+        """Update the tier from the queue *depth* and recorded latencies.
+
+        Latencies recorded since the previous call are consumed.  Returns
+        the (possibly changed) tier level.
+        """
+        if now is None:
+            now = time.monotonic()
+        if self._latencies:
+            p90 = float(np.percentile(np.fromiter(self._latencies, float), 90))
+            self._latencies.clear()
+        else:
+            p90 = 0.0
+        self._last_p90_s = p90
+
+        overloaded = depth >= self.queue_high or p90 > self.latency_high_s
+        calm = depth < self.queue_high / 2 and p90 < self.latency_high_s / 2
+
+        if overloaded:
+            self._calm_since = None
+            if self._level < self.max_tier:
+                self._change(self._level + 1, depth, p90)
+        elif calm and self._level > 0:
+            if self._calm_since is None:
+                self._calm_since = now
+            elif now - self._calm_since >= self.recovery_s:
+                self._calm_since = now
+                self._change(self._level - 1, depth, p90)
+        else:
+            self._calm_since = None
+        return self._level
+
+    def _change(self, level: int, depth: int, p90: float):
+        down = level > self._level
+        self._level = level
+        log = logger.warning if down else logger.info
+        log(
+            "Quality tier stepped %s to %d (queue depth=%d, p90 latency=%.0fms)",
+            "down" if down else "up",
+            level,
+            depth,
+            p90 * 1000.0,
+        )
+
+
+controller = TierController(
+    max_tier=config.QUALITY_MAX_TIER if config.QUALITY_TIERS_ENABLED else 0,
+    queue_high=config.QUALITY_QUEUE_HIGH,
+    latency_high_s=config.QUALITY_LATENCY_HIGH_S,
+    recovery_s=config.QUALITY_RECOVERY_S,
+    det_size=config.QUALITY_DEGRADED_DET_SIZE,
+)
+
+_task: Optional[asyncio.Task] = None
+
+
+def current() -> Tier:
+    """The tier /recognize should use for the next request."""
+    return controller.current()
+
+
+async def _run(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        controller.evaluate(inference_queue.queue.depth())
+
+
+def start(interval: Optional[float] = None):
+    """Start the periodic tier evaluation (no-op if disabled or running)."""
+    global _task
+    if interval is None:
+        interval = config.QUALITY_CHECK_INTERVAL_S
+    if controller.max_tier == 0 or interval <= 0:
+        return
+    if _task is not None and not _task.done():
+        return
+    _task = asyncio.create_task(_run(interval))
+    logger.info(
+        "Quality tiers enabled up to tier %d (checked every %.1fs)",
+        controller.max_tier,
+        interval,
+    )
+
+
+async def stop():
+    """Cancel the periodic tier evaluation."""
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
@@ -0,0 +1,64 @@
+"""Startup readiness state shared by the lifespan hook and health routes.
+
+The service process accepts connections before models are loaded so that
+orchestration can distinguish a *live* instance (process up, startup still
+running) from a *ready* one (models loaded, warmed up and DB reachable).
+A failed startup stops the server (:func:`request_shutdown`) so that the
+container's restart policy retries it.
+"""
+
+import logging
+import signal
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+STARTING = "starting"
+READY = "ready"
+FAILED = "failed"
+
+_state = STARTING
+_error: Optional[str] = None
+
+
+def mark_ready():
+    """Flag the service as ready to receive traffic."""
+    global _state
+    _state = READY
+    logger.info("face-service is ready")
+
+
+def mark_failed(exc: BaseException):
+    """Flag startup as failed; liveness will report the instance as dead."""
+    global _state, _error
+    _state = FAILED
+    _error = str(exc) or exc.__class__.__name__
+
+
+def request_shutdown():
+    """Ask the server to exit, as ``docker stop`` would.
+
+    Sends SIGTERM to this process so uvicorn runs the lifespan shutdown and
+    exits.  Docker only restarts containers that exit; one that stays up
+    answering 503 would never be replaced.
+    """
+    logger.error("Stopping face-service so it can be restarted")
+    signal.raise_signal(signal.SIGTERM)
+
+
+def state() -> str:
+    """Return the current startup state (starting / ready / failed)."""
+    return _state
+
+
+def error() -> Optional[str]:
+    """Return the startup failure message, if any."""
+    return _error
+
+
+def is_ready() -> bool:
+    return _state == READY
+
+
+def is_failed() -> bool:
+    return _state == FAILED
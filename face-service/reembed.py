@@ -0,0 +1,234 @@
+"""Resumable bulk re-embedding of archived enrolment images.
+
+When ``INSIGHTFACE_MODEL_NAME`` or the model version changes, stored
+templates are incompatible with new query embeddings.  This job re-runs
+every archived enrolment image (see ``enrolment_archive``) through the
+registration pipeline with the new model and writes the results to
+``face_embeddings`` tagged with ``--model-version``.  The running service
+keeps matching against ``EMBEDDING_MODEL_VERSION`` until cutover, so the
+job can run alongside it::
+
+    INSIGHTFACE_MODEL_NAME=antelopev2 INFERENCE_WORKERS=4 \\
+        python reembed.py --model-version antelopev2
+
+    # then deploy the service with
+    INSIGHTFACE_MODEL_NAME=antelopev2 EMBEDDING_MODEL_VERSION=antelopev2
+
+Progress is checkpointed after every batch; re-running the same command
+resumes, and also picks up people enrolled since the previous run.
+Templates of people without archived images must be re-enrolled.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Optional
+
+import numpy as np
+
+import config
+import database
+import enrolment_archive
+import gallery_compaction
+import inference_queue
+import worker_pool
+from utils import decode_image_bytes
+
+logger = logging.getLogger(__name__)
+
+
+def _load_checkpoint(path: str, model_version: str, restart: bool) -> dict:
+    if restart or not os.path.exists(path):
+        return {"model_version": model_version, "done": {}}
+    with open(path, "r", encoding="utf-8") as fh:
+        checkpoint = json.load(fh)
+    if checkpoint.get("model_version") != model_version:
+        raise SystemExit(
+            f"Checkpoint {path} is for model version "
+            f"{checkpoint.get('model_version')!r}; use --restart to discard it"
+        )
+    return checkpoint
+
+
+def _save_checkpoint(path: str, checkpoint: dict):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(checkpoint, fh)
+    os.replace(tmp_path, path)
+
+
+def _embed_file(personnel_id: int, name: str) -> Optional[np.ndarray]:
+    """Run one archived image through the registration pipeline."""
+    import face_detector
+    import face_recognizer
+
+    path = enrolment_archive.image_path(personnel_id, name)
+    try:
+        with open(path, "rb") as fh:
+            decoded = decode_image_bytes(fh.read())
+        face, _ = face_detector.detect_enrolment_face(decoded)
+    except Exception as exc:
+        logger.warning("Skipping %s: %s", path, exc)
+        return None
+    if face is None:
+        logger.warning("No face in %s", path)
+        return None
+    return face_recognizer.get_embedding(face)
+
+
+def _pending_work(checkpoint: dict) -> list[tuple[int, list[str]]]:
+    """People whose archived image set differs from the checkpoint."""
+    done = checkpoint["done"]
+    work = []
+    for personnel_id in enrolment_archive.list_personnel():
+        names = enrolment_archive.list_images(personnel_id)
+        if names and done.get(str(personnel_id)) != names:
+            work.append((personnel_id, names))
+    return work
+
+
+def _batches(work, batch_images: int):
+    batch, size = [], 0
+    for personnel_id, names in work:
+        batch.append((personnel_id, names))
+        size += len(names)
+        if size >= batch_images:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+async def _load_models(concurrency: int) -> int:
+    """Load the models and return how many images to run at once.
+
+    Jobs are dispatched like /register's: through an inference queue at
+    registration priority, then to the worker pool when one is configured.
+    Worker processes give real parallelism; in-process mode still overlaps
+    decoding with ONNX Runtime, which releases the GIL.
+    """
+    if config.INFERENCE_WORKERS > 0:
+        await asyncio.to_thread(worker_pool.start)
+        return worker_pool.pool.size()
+    # Imported here, like in worker_pool's workers, so the checkpoint logic
+    # loads without InsightFace.
+    import face_recognizer
+
+    await asyncio.to_thread(face_recognizer.load_model)
+    return max(1, concurrency)
+
+
+async def run(args: argparse.Namespace):
+    checkpoint = _load_checkpoint(args.checkpoint, args.model_version, args.restart)
+    work = _pending_work(checkpoint)
+    total_images = sum(len(names) for _, names in work)
+    logger.info(
+        "Re-embedding %d images for %d personnel as model version %r",
+        total_images,
+        len(work),
+        args.model_version,
+    )
+    if not work:
+        return
+
+    concurrency = await _load_models(args.concurrency)
+
+    # Deep enough for a whole batch; batches are awaited one at a time.
+    queue = inference_queue.InferenceQueue(
+        max_depth=total_images, concurrency=concurrency
+    )
+
+    await database.create_pool()
+    started = time.monotonic()
+    processed = 0
+    try:
+        for batch in _batches(work, args.batch_images):
+            jobs = [(pid, name) for pid, names in batch for name in names]
+            results = await asyncio.gather(
+                *(
+                    queue.submit(
+                        _embed_file,
+                        pid,
+                        name,
+                        priority=inference_queue.PRIORITY_REGISTER,
+                    )
+                    for pid, name in jobs
+                )
+            )
+            by_person: dict[int, list[np.ndarray]] = {}
+            for (personnel_id, _), emb in zip(jobs, results):
+                if emb is not None:
+                    by_person.setdefault(personnel_id, []).append(emb)
+
+            for personnel_id, names in batch:
+                embeddings = by_person.get(personnel_id, [])
+                if embeddings:
+                    await database.set_embeddings(
+                        personnel_id, embeddings, args.model_version
+                    )
+                    if args.compact:
+                        await gallery_compaction.compact_personnel(
+                            personnel_id, model_version=args.model_version
+                        )
+                else:
+                    logger.warning(
+                        "No usable face in any image of personnel %d", personnel_id
+                    )
+                checkpoint["done"][str(personnel_id)] = names
+
+            _save_checkpoint(args.checkpoint, checkpoint)
+            processed += len(jobs)
+            elapsed = time.monotonic() - started
+            rate = processed / elapsed if elapsed > 0 else 0.0
+            eta = (total_images - processed) / rate if rate > 0 else 0.0
+            logger.info(
+                "%d/%d images (%.1f img/s, ETA %.0f min)",
+                processed,
+                total_images,
+                rate,
+                eta / 60.0,
+            )
+    finally:
+        await database.close_pool()
+        await asyncio.to_thread(worker_pool.stop)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    )
+    parser = argparse.ArgumentParser(
+        description="Regenerate face_embeddings from archived enrolment images"
+    )
+    parser.add_argument(
+        "--model-version",
+        default=config.INSIGHTFACE_MODEL_NAME,
+        help="Version tag for the new templates (default: INSIGHTFACE_MODEL_NAME)",
+    )
+    parser.add_argument("--batch-images", type=int, default=256)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=2,
+        help="Images in flight in in-process mode "
+        "(worker mode uses INFERENCE_WORKERS)",
+    )
+    parser.add_argument("--checkpoint", default="reembed_checkpoint.json")
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore an existing checkpoint"
+    )
+    parser.add_argument(
+        "--compact", action="store_true", help="Compact each person after writing"
+    )
+    parsed = parser.parse_args()
+    if parsed.model_version == config.EMBEDDING_MODEL_VERSION:
+        logger.warning(
+            "Writing to the active model version %r; running services will see "
+            "templates change as the job progresses",
+            parsed.model_version,
+        )
+    asyncio.run(run(parsed))
@@ -0,0 +1,133 @@
+"""Response encodings: a fast default JSON renderer and compact embeddings.
+
+When ``orjson`` is installed it renders every JSON response; otherwise
+FastAPI's standard encoder is used.
+
+``/register`` can also return its embeddings in a compact form, chosen
+by the request's ``Accept`` header.  Clients that send plain JSON (or
+``*/*``) get the original list-of-floats body, so existing callers are
+unaffected:
+
+- ``application/vnd.face-embeddings+json`` — the usual JSON envelope,
+  but each embedding is a base64 string of little-endian floats.
+- ``application/octet-stream`` — the embeddings as one raw little-endian
+  matrix, with ``X-Embedding-Count``, ``X-Embedding-Dim`` and
+  ``X-Embedding-Dtype`` headers.
+
+Both take a ``dtype`` parameter: ``float32`` (default) or ``float16``,
+e.g. ``Accept: application/octet-stream; dtype=float16``.
+"""
+
+import base64
+from typing import Optional
+
+import numpy as np
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+from models import CompactRegisterResponse, RegisterResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """``JSONResponse`` rendered with orjson (numpy values allowed)."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+# Default response class for the app.
+DefaultJSONResponse = FastJSONResponse if orjson is not None else JSONResponse
+
+FORMAT_JSON = "json"
+FORMAT_BASE64 = "base64"
+FORMAT_BINARY = "binary"
+
+BASE64_MEDIA_TYPE = "application/vnd.face-embeddings+json"
+BINARY_MEDIA_TYPE = "application/octet-stream"
+
+_FORMATS = {
+    "application/json": FORMAT_JSON,
+    "application/*": FORMAT_JSON,
+    "*/*": FORMAT_JSON,
+    BASE64_MEDIA_TYPE: FORMAT_BASE64,
+    BINARY_MEDIA_TYPE: FORMAT_BINARY,
+}
+_DTYPES = {"float32": np.dtype("<f4"), "float16": np.dtype("<f2")}
+
+
+def negotiate_embeddings(accept: Optional[str]) -> tuple[str, str]:
+    """Pick ``(format, dtype)`` for embeddings from an ``Accept`` header.
+
+    Media ranges are tried by descending ``q`` value, then in header
+    order; unknown types are skipped.  Falls back to plain JSON.
+    """
+    candidates = []
+    for position, part in enumerate((accept or "").split(",")):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        fmt = _FORMATS.get(media_type.lower())
+        if fmt is None:
+            continue
+        options = {}
+        for param in params:
+            key, _, value = param.partition("=")
+            options[key.strip().lower()] = value.strip().strip('"').lower()
+        try:
+            q = float(options.get("q", "1"))
+        except ValueError:
+            q = 0.0
+        dtype = options.get("dtype", "float32")
+        if q <= 0 or dtype not in _DTYPES:
+            continue
+        candidates.append((-q, position, fmt, dtype))
+    if not candidates:
+        return FORMAT_JSON, "float32"
+    _, _, fmt, dtype = min(candidates)
+    return fmt, dtype
+
+
+def register_response(
+    success: bool, embeddings: list[np.ndarray], fmt: str, dtype: str
+):
+    """Build the ``/register`` response in the negotiated encoding."""
+    if fmt == FORMAT_JSON:
+        return RegisterResponse(
+            success=success,
+            embeddings=[emb.tolist() for emb in embeddings],
+        )
+
+    dim = int(embeddings[0].shape[0]) if embeddings else 0
+    if fmt == FORMAT_BASE64:
+        content = CompactRegisterResponse(
+            success=success,
+            dtype=dtype,
+            dim=dim,
+            embeddings=[
+                base64.b64encode(emb.astype(_DTYPES[dtype]).tobytes()).decode("ascii")
+                for emb in embeddings
+            ],
+        )
+        return DefaultJSONResponse(
+            content=content.model_dump(),
+            media_type=f"{BASE64_MEDIA_TYPE}; dtype={dtype}",
+        )
+
+    # Binary: failures stay JSON so the client can tell them apart by
+    # Content-Type.
+    if not success or not embeddings:
+        return DefaultJSONResponse(
+            content=RegisterResponse(success=success, embeddings=[]).model_dump()
+        )
+    matrix = np.stack(embeddings).astype(_DTYPES[dtype])
+    return Response(
+        content=matrix.tobytes(),
+        media_type=f"{BINARY_MEDIA_TYPE}; dtype={dtype}",
+        headers={
+            "X-Embedding-Count": str(matrix.shape[0]),
+            "X-Embedding-Dim": str(matrix.shape[1]),
+            "X-Embedding-Dtype": dtype,
+        },
+    )
@@ -0,0 +1,45 @@
+"""POST /delete-enrolment-images — forget a person's archived enrolment images."""
+
+import asyncio
+import logging
+
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+import embedding_cache
+import enrolment_archive
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+class DeleteEnrolmentImagesRequest(BaseModel):
+    personnel_id: int
+
+
+class DeleteEnrolmentImagesResponse(BaseModel):
+    success: bool
+    deleted: int
+
+
+@router.post(
+    "/delete-enrolment-images", response_model=DeleteEnrolmentImagesResponse
+)
+async def delete_enrolment_images(body: DeleteEnrolmentImagesRequest):
+    """Delete the archived source images of one person.
+
+    Called by the API when a person's face registrations are all deleted
+    (before re-enrolment) or the person is removed, so ``reembed.py`` never
+    regenerates templates from images that are no longer wanted.
+    """
+    try:
+        deleted = await asyncio.to_thread(enrolment_archive.delete, body.personnel_id)
+    except OSError as exc:
+        logger.error(
+            "Failed to delete enrolment images of personnel %d: %s",
+            body.personnel_id,
+            exc,
+        )
+        return DeleteEnrolmentImagesResponse(success=False, deleted=0)
+    embedding_cache.invalidate_personnel(body.personnel_id)
+    return DeleteEnrolmentImagesResponse(success=True, deleted=deleted)
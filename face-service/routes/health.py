@@ -1,17 +1,27 @@
-"""GET /health — service health check."""
+"""GET /health — service health check and orchestration probes."""
 
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 
-from models import HealthResponse
+from models import HealthResponse, ProbeResponse, WorkersResponse
 import face_recognizer
+import quality_tier
+import readiness
+import worker_pool
 
 router = APIRouter()
 
 
 @router.get("/health", response_model=HealthResponse)
 async def health():
-    loaded = face_recognizer.is_model_loaded()
-    status = "healthy" if loaded else "degraded"
+    loaded = face_recognizer.is_model_loaded() or worker_pool.is_running()
+    ready = readiness.is_ready()
+    if ready:
+        status = "healthy"
+    elif readiness.is_failed():
+        status = "unhealthy"
+    else:
+        status = "starting"
     model_status = "loaded" if loaded else "not_loaded"
 
     return HealthResponse(
@@ -19,4 +29,39 @@ async def health():
         face_detection=model_status,
         face_recognition=model_status,
         anti_spoofing="disabled",
+        ready=ready,
+        quality_tier=quality_tier.controller.level,
     )
+
+
+@router.get("/health/live", response_model=ProbeResponse)
+async def liveness():
+    """Liveness probe: fails only when startup has failed for good."""
+    if readiness.is_failed():
+        return JSONResponse(
+            status_code=503,
+            content=ProbeResponse(
+                status=readiness.state(), detail=readiness.error()
+            ).model_dump(),
+        )
+    return ProbeResponse(status="alive")
+
+
+@router.get("/health/ready", response_model=ProbeResponse)
+async def readiness_probe():
+    """Readiness probe: succeeds once models are loaded and warmed up."""
+    if not readiness.is_ready():
+        return JSONResponse(
+            status_code=503,
+            content=ProbeResponse(
+                status=readiness.state(), detail=readiness.error()
+            ).model_dump(),
+        )
+    return ProbeResponse(status=readiness.state())
+
+
+@router.get("/health/workers", response_model=WorkersResponse)
+async def workers():
+    """Per-worker job counts and utilisation in worker-pool mode."""
+    mode = "worker_pool" if worker_pool.is_running() else "in_process"
+    return WorkersResponse(mode=mode, workers=worker_pool.stats())
@@ -1,25 +1,52 @@
 """POST /recognize — identify a person from a face image."""
 
 import logging
+import time
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
 from models import RecognizeRequest, RecognizeResponse
-from utils import decode_base64_image
-import database
+from utils import ImageTooLargeError, decode_image
+import anti_spoof
+import config
 import embedding_cache
 import face_detector
 import face_recognizer
+import inference_queue
+import quality_tier
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
 @router.post("/recognize", response_model=RecognizeResponse)
-async def recognize(body: RecognizeRequest):
+async def recognize(body: RecognizeRequest, request: Request):
+    started = time.perf_counter()
+    try:
+        return await _recognize(body, request, quality_tier.current())
+    finally:
+        # Rejected and timed-out requests are the overload signal too.
+        quality_tier.controller.record_latency(time.perf_counter() - started)
+
+
+async def _recognize(
+    body: RecognizeRequest, request: Request, tier: quality_tier.Tier
+) -> RecognizeResponse:
+    deadline = inference_queue.deadline_for(
+        inference_queue.PRIORITY_RECOGNIZE, request.headers
+    )
+
     # 1. Decode image
     try:
-        image = decode_base64_image(body.image)
+        decoded = decode_image(body.image)
+    except ImageTooLargeError as exc:
+        logger.warning("Rejected oversized image: %s", exc)
+        return RecognizeResponse(
+            success=False,
+            personnel_id=None,
+            confidence=0.0,
+            message="Image too large",
+        )
     except Exception as exc:
         logger.error("Image decode failed: %s", exc)
         return RecognizeResponse(
@@ -29,8 +56,17 @@ async def recognize(body: RecognizeRequest):
             message="Invalid image data",
         )
 
-    # 2. Detect face
-    face = face_detector.detect_face(image)
+    # 2. Detect face (queued ahead of registration work), near
+    #    the client's ROI hint first when one is given
+    face = await inference_queue.queue.submit(
+        face_detector.detect_probe_face,
+        decoded,
+        body.roi,
+        tier.det_size,
+        tier.refine,
+        priority=inference_queue.PRIORITY_RECOGNIZE,
+        deadline=deadline,
+    )
     if face is None:
         return RecognizeResponse(
             success=False,
@@ -39,6 +75,26 @@ async def recognize(body: RecognizeRequest):
             message="No face detected",
         )
 
+    bbox = [round(float(v), 1) for v in face.bbox]
+
+    # Liveness (skipped from quality tier 2 on)
+    if config.ANTISPOOF_ENABLED and tier.liveness:
+        is_real, _ = await inference_queue.queue.submit(
+            anti_spoof.check_liveness,
+            decoded.image,
+            face.bbox / decoded.scale,
+            priority=inference_queue.PRIORITY_RECOGNIZE,
+            deadline=deadline,
+        )
+        if not is_real:
+            return RecognizeResponse(
+                success=False,
+                personnel_id=None,
+                confidence=0.0,
+                message="Spoof detected",
+                bbox=bbox,
+            )
+
     # 3. Extract embedding
     try:
         embedding = face_recognizer.get_embedding(face)
@@ -49,14 +105,12 @@ async def recognize(body: RecognizeRequest):
             personnel_id=None,
             confidence=0.0,
             message="Embedding extraction failed",
+            bbox=bbox,
         )
 
     # 4. Load stored embeddings for the station (with cache)
     try:
-        stored = embedding_cache.get(body.station_id)
-        if stored is None:
-            stored = await database.get_embeddings_by_station(body.station_id)
-            embedding_cache.put(body.station_id, stored)
+        stored = await embedding_cache.get_or_load(body.station_id)
     except Exception as exc:
         logger.error("Database query failed: %s", exc)
         return RecognizeResponse(
@@ -64,6 +118,7 @@ async def recognize(body: RecognizeRequest):
             personnel_id=None,
             confidence=0.0,
             message="Database error",
+            bbox=bbox,
         )
 
     if not stored:
@@ -72,10 +127,11 @@ async def recognize(body: RecognizeRequest):
             personnel_id=None,
             confidence=0.0,
             message="No registered faces for this station",
+            bbox=bbox,
         )
 
-    # 5. Compare
-    personnel_id, confidence = face_recognizer.compare_embeddings(embedding, stored)
+    # 5. Compare
+    personnel_id, confidence = stored.match(embedding)
 
     if personnel_id is None:
         return RecognizeResponse(
@@ -83,6 +139,7 @@ async def recognize(body: RecognizeRequest):
             personnel_id=None,
             confidence=0.0,
             message="Face not recognized",
+            bbox=bbox,
         )
 
     # Return the match — threshold enforcement is done by the NestJS API
@@ -91,4 +148,5 @@ async def recognize(body: RecognizeRequest):
         personnel_id=personnel_id,
         confidence=confidence,
         message="Face recognized",
+        bbox=bbox,
     )
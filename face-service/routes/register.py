@@ -1,66 +1,112 @@
 """POST /register — register face embeddings for a person."""
 
+import asyncio
 import logging
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
 from models import RegisterRequest, RegisterResponse
-from utils import decode_base64_image
+from utils import ImageTooLargeError, decode_image
+import config
 import database
 import embedding_cache
+import enrolment_archive
 import face_detector
 import face_recognizer
+import gallery_compaction
+import inference_queue
+import response_encoding
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
 @router.post("/register", response_model=RegisterResponse)
-async def register(body: RegisterRequest):
+async def register(body: RegisterRequest, request: Request):
+    # Embedding encoding requested via Accept (see response_encoding)
+    fmt, dtype = response_encoding.negotiate_embeddings(request.headers.get("accept"))
+
+    def respond(success: bool, embeddings: list):
+        return response_encoding.register_response(success, embeddings, fmt, dtype)
+
     embeddings = []
+    sources: list[bytes] = []
+    # One deadline for the whole request: later images are dropped once the
+    # caller can no longer use the result.
+    deadline = inference_queue.deadline_for(
+        inference_queue.PRIORITY_REGISTER, request.headers
+    )
 
     for idx, img_b64 in enumerate(body.images):
         # Decode image
         try:
-            image = decode_base64_image(img_b64)
+            decoded = decode_image(img_b64)
+        except ImageTooLargeError as exc:
+            logger.error("Image %d rejected: %s", idx, exc)
+            return respond(False, [])
         except Exception as exc:
             logger.error("Image %d decode failed: %s", idx, exc)
-            return RegisterResponse(success=False, embeddings=[])
+            return respond(False, [])
 
-        # Detect face.
-        # Registration is more tolerant than recognition so users can enroll
-        # in suboptimal lighting/angles and still generate embeddings.
-        face = face_detector.detect_face(image)
+        # Detect face (with low-quality fallback, see detect_enrolment_face)
+        face, used_fallback = await inference_queue.queue.submit(
+            face_detector.detect_enrolment_face,
+            decoded,
+            priority=inference_queue.PRIORITY_REGISTER,
+            deadline=deadline,
+        )
         if face is None:
-            fallback_faces = face_detector.detect_faces(image)
-            if fallback_faces:
-                face = fallback_faces[0]
-                logger.warning(
-                    "Image %d for personnel %d passed fallback face selection "
-                    "(det_score=%.3f below MIN_FACE_DET_SCORE)",
-                    idx,
-                    body.personnel_id,
-                    float(getattr(face, "det_score", 0.0)),
-                )
-            else:
-                logger.warning(
-                    "No face in image %d for personnel %d", idx, body.personnel_id
-                )
-                continue
+            logger.warning(
+                "No face in image %d for personnel %d", idx, body.personnel_id
+            )
+            continue
+        if used_fallback:
+            logger.warning(
+                "Image %d for personnel %d passed fallback face selection "
+                "(det_score=%.3f below MIN_FACE_DET_SCORE)",
+                idx,
+                body.personnel_id,
+                float(getattr(face, "det_score", 0.0)),
+            )
 
         # Extract embedding
         emb = face_recognizer.get_embedding(face)
         embeddings.append(emb)
+        sources.append(decoded.data)
 
     if not embeddings:
-        return RegisterResponse(success=False, embeddings=[])
+        return respond(False, [])
 
     # Save to database
     try:
         await database.save_embeddings(body.personnel_id, embeddings)
     except Exception as exc:
         logger.error("Failed to save embeddings: %s", exc)
-        return RegisterResponse(success=False, embeddings=[])
+        return respond(False, [])
+
+    # Keep the source images so templates can be regenerated after a
+    # model upgrade (see reembed.py)
+    try:
+        await asyncio.to_thread(enrolment_archive.save, body.personnel_id, sources)
+    except Exception as exc:
+        logger.warning(
+            "Failed to archive enrolment images for personnel %d: %s",
+            body.personnel_id,
+            exc,
+        )
+
+    # Keep the person's template count bounded (dedup + clustering)
+    if config.GALLERY_COMPACT_ON_REGISTER:
+        try:
+            await gallery_compaction.compact_personnel(body.personnel_id)
+        except Exception as exc:
+            logger.warning(
+                "Gallery compaction failed for personnel %d: %s",
+                body.personnel_id,
+                exc,
+            )
+
+    embedding_cache.invalidate_personnel(body.personnel_id)
 
     # Invalidate embedding cache for the personnel's station
     try:
@@ -82,7 +128,4 @@ async def register(body: RegisterRequest):
         len(embeddings),
         body.personnel_id,
     )
-    return RegisterResponse(
-        success=True,
-        embeddings=[emb.tolist() for emb in embeddings],
-    )
+    return respond(True, embeddings)
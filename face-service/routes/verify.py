@@ -0,0 +1,78 @@
+"""POST /verify — check a face image against one claimed person (1:1)."""
+
+import logging
+
+from fastapi import APIRouter, Request
+
+from models import VerifyRequest, VerifyResponse
+from utils import ImageTooLargeError, decode_image
+import embedding_cache
+import face_detector
+import face_recognizer
+import inference_queue
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.post("/verify", response_model=VerifyResponse)
+async def verify(body: VerifyRequest, request: Request):
+    def fail(message: str) -> VerifyResponse:
+        return VerifyResponse(
+            success=False,
+            personnel_id=body.personnel_id,
+            confidence=0.0,
+            message=message,
+        )
+
+    # 1. Decode image
+    try:
+        decoded = decode_image(body.image)
+    except ImageTooLargeError as exc:
+        logger.warning("Rejected oversized image: %s", exc)
+        return fail("Image too large")
+    except Exception as exc:
+        logger.error("Image decode failed: %s", exc)
+        return fail("Invalid image data")
+
+    # 2. Detect face (same priority as /recognize: a caller is waiting)
+    face = await inference_queue.queue.submit(
+        face_detector.detect_probe_face,
+        decoded,
+        priority=inference_queue.PRIORITY_RECOGNIZE,
+        deadline=inference_queue.deadline_for(
+            inference_queue.PRIORITY_RECOGNIZE, request.headers
+        ),
+    )
+    if face is None:
+        return fail("No face detected")
+
+    # 3. Extract embedding
+    try:
+        embedding = face_recognizer.get_embedding(face)
+    except Exception as exc:
+        logger.error("Embedding extraction failed: %s", exc)
+        return fail("Embedding extraction failed")
+
+    # 4. Load only the claimed person's templates (with cache)
+    try:
+        stored = await embedding_cache.get_or_load_personnel(body.personnel_id)
+    except Exception as exc:
+        logger.error("Database query failed: %s", exc)
+        return fail("Database error")
+
+    if not stored:
+        return fail("No registered faces for this personnel")
+
+    # 5. Compare against that person only — no 1:N search
+    matched_id, confidence = stored.match(embedding)
+    if matched_id is None:
+        return fail("Embedding dimension mismatch")
+
+    # Return the similarity — threshold enforcement is done by the NestJS API
+    return VerifyResponse(
+        success=True,
+        personnel_id=body.personnel_id,
+        confidence=confidence,
+        message="Face verified",
+    )
@@ -0,0 +1,78 @@
+import json
+
+import numpy as np
+
+from database import _ChunkDecoder
+from gallery import Gallery
+
+
+def _row(personnel_id, vec):
+    return personnel_id, json.dumps([float(v) for v in vec])
+
+
+def _rows(rng, spec):
+    """``(personnel_id, json)`` rows plus the raw vectors, per ``(pid, dim)``."""
+    rows, vectors = [], []
+    for personnel_id, dim in spec:
+        vec = rng.standard_normal(dim).astype(np.float32) * 3.0
+        rows.append(_row(personnel_id, vec))
+        vectors.append((personnel_id, vec))
+    return rows, vectors
+
+
+def test_keeps_rows_of_every_dimension():
+    rng = np.random.default_rng(0)
+    # A 128-dim row first, as left behind by an older model.
+    rows, vectors = _rows(rng, [(1, 128), (2, 512), (3, 512), (1, 512), (4, 128)])
+    decoder = _ChunkDecoder(expected_rows=len(rows))
+    for start in range(0, len(rows), 2):
+        decoder.decode(rows[start : start + 2])
+
+    blocks = decoder.result()
+
+    assert sorted(blocks) == [128, 512]
+    ids_128, vecs_128 = blocks[128]
+    ids_512, vecs_512 = blocks[512]
+    assert ids_128.tolist() == [1, 4]
+    assert ids_512.tolist() == [2, 3, 1]
+    assert vecs_128.dtype == vecs_512.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(vecs_512, axis=1), 1.0, rtol=1e-5)
+    np.testing.assert_allclose(np.linalg.norm(vecs_128, axis=1), 1.0, rtol=1e-5)
+    expected = vectors[2][1] / np.linalg.norm(vectors[2][1])
+    np.testing.assert_allclose(vecs_512[1], expected, rtol=1e-5)
+
+
+def test_mixed_dimension_gallery_matches_both_models():
+    rng = np.random.default_rng(1)
+    rows, vectors = _rows(rng, [(1, 128), (2, 512), (3, 512), (4, 128), (5, 512)])
+    decoder = _ChunkDecoder(expected_rows=len(rows))
+    decoder.decode(rows)
+
+    gallery = Gallery.from_blocks(decoder.result())
+
+    assert len(gallery) == 5
+    for personnel_id, vec in vectors:
+        matched, confidence = gallery.match(vec)
+        assert matched == personnel_id
+        assert confidence == 1.0
+
+
+def test_grows_past_a_stale_row_count_and_skips_bad_rows():
+    rng = np.random.default_rng(2)
+    rows, _ = _rows(rng, [(pid, 64) for pid in range(1, 11)])
+    rows.insert(3, (99, "not json"))
+    rows.insert(5, (98, "[]"))
+    decoder = _ChunkDecoder(expected_rows=2)
+    for start in range(0, len(rows), 3):
+        decoder.decode(rows[start : start + 3])
+
+    ids, vectors = decoder.result()[64]
+    assert ids.tolist() == list(range(1, 11))
+    assert vectors.shape == (10, 64)
+
+
+def test_no_rows():
+    decoder = _ChunkDecoder(expected_rows=0)
+    decoder.decode([])
+    assert decoder.result() == {}
+    assert len(Gallery.from_blocks(decoder.result())) == 0
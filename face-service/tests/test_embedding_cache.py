@@ -0,0 +1,149 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import cache_refresher
+import database
+import embedding_cache
+
+
+class FakeDB:
+    """Stands in for the ``database`` queries the cache makes."""
+
+    def __init__(self):
+        self.fingerprints = {1: (2, 11, 10 ^ 11), 2: (1, 12, 12)}
+        self.rows = {
+            1: [(10, [1.0, 0.0]), (11, [0.0, 1.0])],
+            2: [(12, [1.0, 0.0])],
+        }
+        self.calls: list[str] = []
+
+    async def get_station_fingerprints(self, model_version=None):
+        self.calls.append("all")
+        total = tuple(map(sum, zip(*self.fingerprints.values())))
+        return {**self.fingerprints, 0: total}
+
+    async def get_station_fingerprint(self, station_id, model_version=None):
+        self.calls.append(f"one:{station_id}")
+        return self.fingerprints.get(station_id, (0, 0, 0))
+
+    async def get_embeddings_by_station(self, station_id, expected_rows=0, **kwargs):
+        self.calls.append(f"rows:{station_id}")
+        rows = self.rows.get(station_id, [])
+        ids = np.array([pid for pid, _ in rows], dtype=np.int32)
+        vectors = np.array([vec for _, vec in rows], dtype=np.float32)
+        return {2: (ids, vectors)} if rows else {}
+
+    async def get_embeddings_by_personnel(self, personnel_id, active_only=False):
+        self.calls.append(f"person:{personnel_id}")
+        vectors = [
+            vec
+            for rows in self.rows.values()
+            for pid, vec in rows
+            if pid == personnel_id
+        ]
+        return [(i, np.array(v, dtype=np.float32)) for i, v in enumerate(vectors)]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeDB()
+    for name in (
+        "get_station_fingerprints",
+        "get_station_fingerprint",
+        "get_embeddings_by_station",
+        "get_embeddings_by_personnel",
+    ):
+        monkeypatch.setattr(database, name, getattr(fake, name))
+    monkeypatch.setattr(embedding_cache, "_person_fingerprint", None)
+    embedding_cache.invalidate()
+    yield fake
+    embedding_cache.invalidate()
+
+
+def test_miss_reads_only_that_stations_fingerprint(db):
+    gallery = asyncio.run(embedding_cache.get_or_load(1))
+
+    assert len(gallery) == 2
+    assert db.calls == ["one:1", "rows:1"]
+    assert embedding_cache.fingerprint(1) == db.fingerprints[1]
+
+
+def test_hit_does_not_query(db):
+    async def main():
+        await embedding_cache.get_or_load(1)
+        db.calls.clear()
+        return await embedding_cache.get_or_load(1)
+
+    assert len(asyncio.run(main())) == 2
+    assert db.calls == []
+
+
+def test_refresh_reloads_changed_station_with_one_fingerprint_query(db):
+    async def main():
+        await embedding_cache.get_or_load(1)
+        await embedding_cache.get_or_load(2)
+        db.calls.clear()
+        db.fingerprints[1] = (3, 13, 10 ^ 11 ^ 13)
+        db.rows[1].append((13, [0.6, 0.8]))
+        return await cache_refresher.refresh_once()
+
+    assert asyncio.run(main()) == [1]
+    assert db.calls == ["all", "rows:1"]
+    assert embedding_cache.fingerprint(1) == (3, 13, 10 ^ 11 ^ 13)
+    assert len(embedding_cache.get(1)) == 3
+
+
+def test_refresh_without_changes_reloads_nothing(db):
+    async def main():
+        await embedding_cache.get_or_load(2)
+        db.calls.clear()
+        return await cache_refresher.refresh_once()
+
+    assert asyncio.run(main()) == []
+    assert db.calls == ["all"]
+
+
+def test_refresh_drops_person_galleries_when_templates_change(db):
+    async def main():
+        await embedding_cache.get_or_load_personnel(10)
+        await cache_refresher.refresh_once()  # records the fingerprint
+        await embedding_cache.get_or_load_personnel(10)
+        db.calls.clear()
+
+        # Person 10 is deactivated: their rows leave station 1's gallery.
+        db.rows[1] = [(11, [0.0, 1.0])]
+        db.fingerprints[1] = (1, 11, 11)
+        await cache_refresher.refresh_once()
+        return await embedding_cache.get_or_load_personnel(10)
+
+    assert len(asyncio.run(main())) == 0
+    assert db.calls == ["all", "person:10"]
+
+
+def test_refresh_keeps_person_galleries_when_nothing_changed(db):
+    async def main():
+        await embedding_cache.get_or_load_personnel(10)
+        await cache_refresher.refresh_once()
+        await embedding_cache.get_or_load_personnel(10)
+        db.calls.clear()
+        await cache_refresher.refresh_once()
+        return await embedding_cache.get_or_load_personnel(10)
+
+    assert len(asyncio.run(main())) == 1
+    assert db.calls == ["all"]
+
+
+def test_load_overlapping_a_change_is_not_cached(db, monkeypatch):
+    async def racing_load(personnel_id, active_only=False):
+        # The refresher sees a change while this person's rows are loading.
+        embedding_cache.check_personnel((9, 9, 9))
+        return [(0, np.array([1.0, 0.0], dtype=np.float32))]
+
+    monkeypatch.setattr(database, "get_embeddings_by_personnel", racing_load)
+    embedding_cache.check_personnel((1, 1, 1))
+
+    asyncio.run(embedding_cache.get_or_load_personnel(10))
+
+    assert not embedding_cache.has_personnel()
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+import config
+import embedding_cache
+import enrolment_archive
+from routes.delete_enrolment_images import (
+    DeleteEnrolmentImagesRequest,
+    delete_enrolment_images,
+)
+
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 16
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 16
+
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    path = tmp_path / "enrolment_images"
+    monkeypatch.setattr(config, "ENROLMENT_IMAGE_DIR", str(path))
+    return path
+
+
+def test_disabled_by_default(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "ENROLMENT_IMAGE_DIR", "")
+
+    assert not enrolment_archive.is_enabled()
+    assert enrolment_archive.save(5, [JPEG]) == []
+    assert enrolment_archive.delete(5) == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_save_and_list(archive_dir):
+    paths = enrolment_archive.save(5, [JPEG, PNG])
+
+    assert [p.rsplit(".", 1)[1] for p in paths] == ["jpg", "png"]
+    assert enrolment_archive.list_personnel() == [5]
+    names = enrolment_archive.list_images(5)
+    assert len(names) == 2
+    with open(enrolment_archive.image_path(5, names[1]), "rb") as fh:
+        assert fh.read() == PNG
+
+
+def test_delete_removes_only_that_person(archive_dir):
+    enrolment_archive.save(5, [JPEG, PNG])
+    enrolment_archive.save(6, [JPEG])
+
+    assert enrolment_archive.delete(5) == 2
+
+    assert enrolment_archive.list_personnel() == [6]
+    assert enrolment_archive.list_images(5) == []
+    assert enrolment_archive.delete(5) == 0
+
+
+def test_delete_route_clears_archive_and_person_cache(archive_dir):
+    enrolment_archive.save(5, [JPEG])
+    embedding_cache._person_cache[5] = (0.0, object())
+
+    response = asyncio.run(
+        delete_enrolment_images(DeleteEnrolmentImagesRequest(personnel_id=5))
+    )
+
+    assert response.success and response.deleted == 1
+    assert enrolment_archive.list_personnel() == []
+    assert 5 not in embedding_cache._person_cache
@@ -0,0 +1,115 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+pytest.importorskip("insightface")
+
+from insightface.app.common import Face  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+
+import config  # noqa: E402
+import face_detector  # noqa: E402
+import inference_queue  # noqa: E402
+from models import RecognizeRequest  # noqa: E402
+from routes import recognize  # noqa: E402
+from utils import DecodedImage  # noqa: E402
+
+
+class FakeDetector:
+    """Stands in for :func:`face_detector.detect_faces`.
+
+    Returns one face at *bbox* (in the coordinates of the image it is
+    given) for images of the listed shapes, and nothing otherwise.
+    """
+
+    def __init__(self, bbox=(10.0, 10.0, 50.0, 50.0), shapes=None):
+        self.bbox = np.array(bbox, dtype=np.float32)
+        self.shapes = shapes
+        self.calls: list[tuple[tuple, int]] = []
+
+    def __call__(self, image, input_size=None):
+        self.calls.append((image.shape[:2], input_size))
+        if self.shapes is not None and image.shape[:2] not in self.shapes:
+            return []
+        kps = np.tile(self.bbox[:2], (5, 1)) + 5.0
+        return [Face(bbox=self.bbox.copy(), kps=kps, det_score=0.9)]
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    monkeypatch.setattr(config, "ROI_EXPANSION", 0.75)
+    monkeypatch.setattr(config, "ROI_DET_SIZE", 320)
+    monkeypatch.setattr(config, "MIN_FACE_DET_SCORE", 0.5)
+    fake = FakeDetector()
+    monkeypatch.setattr(face_detector, "detect_faces", fake)
+    return fake
+
+
+def _decoded(height=240, width=320, scale=1):
+    return DecodedImage(np.zeros((height, width, 3), np.uint8), scale, b"")
+
+
+def test_roi_crop_is_mapped_back_to_original_coordinates(detector):
+    # Decoded at half size: the hint [200, 100, 280, 180] is a 40px box at
+    # (100, 50), padded by 30px into the crop x 70..170, y 20..120.
+    decoded = _decoded(scale=2)
+
+    [face] = face_detector.detect_faces_roi(decoded, [200, 100, 280, 180])
+
+    [(shape, input_size)] = detector.calls
+    assert shape == (100, 100)
+    assert input_size == 128
+    np.testing.assert_allclose(face.bbox, [160, 60, 240, 140])
+    np.testing.assert_allclose(face.kps[0], [170, 70])
+
+
+def test_roi_partly_outside_the_frame_is_clamped(detector):
+    face_detector.detect_faces_roi(_decoded(), [-1e9, 0, 40, 40])
+
+    [(shape, _)] = detector.calls
+    assert shape == (70, 70)
+
+
+@pytest.mark.parametrize(
+    "roi",
+    [
+        [1.7e308, 0, 1.79e308, 10],  # finite, ordered, but off the frame
+        [400, 300, 500, 400],
+        [0, 0, 10, float("nan")],
+        [0, 0, 4, 4],  # crop smaller than the detector's stride
+    ],
+)
+def test_unusable_roi_finds_nothing(detector, roi):
+    assert face_detector.detect_faces_roi(_decoded(), roi) == []
+    assert detector.calls == []
+
+
+def test_probe_falls_back_to_full_frame_without_a_face_near_the_roi(
+    monkeypatch, detector
+):
+    fake = FakeDetector(bbox=(200, 100, 260, 160), shapes=[(240, 320)])
+    monkeypatch.setattr(face_detector, "detect_faces", fake)
+
+    face = face_detector.detect_probe_face(_decoded(), [10, 10, 50, 50])
+
+    assert [shape for shape, _ in fake.calls] == [(80, 80), (240, 320)]
+    np.testing.assert_allclose(face.bbox, [200, 100, 260, 160])
+
+
+def test_recognize_with_huge_roi_does_not_raise(monkeypatch, detector):
+    detector.shapes = []  # no face anywhere
+
+    async def submit(fn, *args, priority, deadline=None):
+        return fn(*args)
+
+    monkeypatch.setattr(inference_queue.queue, "submit", submit)
+    monkeypatch.setattr(recognize, "decode_image", lambda data: _decoded())
+    body = RecognizeRequest(image="", station_id=1, roi=[1.7e308, 0, 1.79e308, 10])
+    request = Request({"type": "http", "headers": []})
+
+    response = asyncio.run(recognize.recognize(body, request))
+
+    assert not response.success
+    assert response.message == "No face detected"
+    assert [shape for shape, _ in detector.calls] == [(240, 320)]
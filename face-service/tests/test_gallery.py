@@ -0,0 +1,106 @@
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+from gallery import Gallery
+
+
+def _reference_match(embedding, stored_embeddings):
+    """The original per-person centroid loop (``compare_embeddings``)."""
+    if not stored_embeddings:
+        return None, 0.0
+    groups = defaultdict(list)
+    for pid, vec in stored_embeddings:
+        groups[pid].append(vec)
+
+    best_id, best_score = None, -1.0
+    for pid, vecs in groups.items():
+        same_dim = [v for v in vecs if v.shape[0] == embedding.shape[0]]
+        if not same_dim:
+            continue
+        centroid = np.mean(same_dim, axis=0).astype(np.float32)
+        centroid = centroid / (np.linalg.norm(centroid) + 1e-10)
+        score = float(
+            np.dot(embedding, centroid)
+            / (np.linalg.norm(embedding) * np.linalg.norm(centroid))
+        )
+        if score > best_score:
+            best_id, best_score = pid, score
+    return best_id, round(max(0.0, min(1.0, best_score)), 4)
+
+
+def _unit(v):
+    return (v / np.linalg.norm(v, axis=-1, keepdims=True)).astype(np.float32)
+
+
+def _station(rng, people=120, dim=512, templates=(1, 8), spread=0.6):
+    """Shuffled ``(pid, vector)`` rows and each person's identity vector."""
+    identities = {pid: _unit(rng.standard_normal(dim)) for pid in range(1, people + 1)}
+    rows = []
+    for pid, identity in identities.items():
+        for _ in range(rng.integers(*templates, endpoint=True)):
+            noise = _unit(rng.standard_normal(dim))
+            rows.append((pid, _unit(identity + spread * noise)))
+    order = rng.permutation(len(rows))
+    return [rows[i] for i in order], identities
+
+
+def _assert_same(actual, expected):
+    assert actual[0] == expected[0]
+    assert actual[1] == pytest.approx(expected[1], abs=1e-4)
+
+
+def test_matches_reference_argmax():
+    rng = np.random.default_rng(0)
+    rows, identities = _station(rng)
+    ids = np.array([pid for pid, _ in rows])
+    gallery = Gallery.from_arrays(ids, np.stack([vec for _, vec in rows]))
+
+    pids = rng.choice(list(identities), 300)
+    for pid in pids:
+        # Noisy enough that the true person loses about half the time, so
+        # the argmax is decided between close scores.
+        probe = _unit(identities[pid] + 8.0 * _unit(rng.standard_normal(512)))
+        _assert_same(gallery.match(probe), _reference_match(probe, rows))
+
+
+def test_matches_reference_with_mixed_dimensions():
+    rng = np.random.default_rng(1)
+    rows_512, identities = _station(rng, people=40)
+    rows_128, _ = _station(rng, people=40, dim=128)
+    rows = rows_512 + rows_128
+    gallery = Gallery.from_pairs(rows)
+
+    assert len(gallery) == len(rows)
+    for dim in (512, 128):
+        for _ in range(50):
+            probe = _unit(rng.standard_normal(dim))
+            _assert_same(gallery.match(probe), _reference_match(probe, rows))
+
+
+def test_unnormalised_probe_scores_as_cosine():
+    rng = np.random.default_rng(2)
+    rows, identities = _station(rng, people=10)
+    gallery = Gallery.from_pairs(rows)
+
+    probe = 7.5 * identities[3]
+    _assert_same(gallery.match(probe), _reference_match(probe, rows))
+
+
+def test_dimension_mismatch_and_empty():
+    rng = np.random.default_rng(3)
+    rows, _ = _station(rng, people=5)
+    gallery = Gallery.from_pairs(rows)
+
+    assert gallery.match(_unit(rng.standard_normal(128))) == (None, 0.0)
+    assert Gallery.empty().match(_unit(rng.standard_normal(512))) == (None, 0.0)
+    assert len(Gallery.from_arrays(np.zeros(0), np.zeros((0, 512)))) == 0
+
+
+def test_keeps_one_centroid_per_person():
+    rng = np.random.default_rng(4)
+    rows, identities = _station(rng, people=50, templates=(4, 8))
+    gallery = Gallery.from_pairs(rows)
+
+    assert gallery.nbytes == 50 * (512 * 4 + 4)
@@ -0,0 +1,114 @@
+import asyncio
+
+import numpy as np
+
+import database
+import gallery_compaction
+from gallery_compaction import compact_templates
+
+
+def _unit(v: np.ndarray) -> np.ndarray:
+    return (v / np.linalg.norm(v, axis=-1, keepdims=True)).astype(np.float32)
+
+
+def _person(rng, count: int, dim: int = 512, spread: float = 0.35):
+    """*count* noisy templates around one random identity."""
+    identity = _unit(rng.standard_normal(dim))
+    noise = _unit(rng.standard_normal((count, dim)))
+    return identity, _unit(identity + spread * noise)
+
+
+def _centroid(vectors: np.ndarray) -> np.ndarray:
+    return _unit(vectors.mean(axis=0))
+
+
+def _best(probe: np.ndarray, centroids: dict[int, np.ndarray]) -> int:
+    return max(centroids, key=lambda pid: float(centroids[pid] @ probe))
+
+
+def test_drops_near_duplicates_keeping_newest():
+    rng = np.random.default_rng(0)
+    _, vectors = _person(rng, 3)
+    vectors = np.vstack([vectors, vectors[1:2]])  # re-enrolled pose
+
+    keep, new = compact_templates(vectors, max_templates=10, dedup_threshold=0.98)
+
+    assert keep == [0, 2, 3]
+    assert new == []
+
+
+def test_caps_template_count():
+    rng = np.random.default_rng(1)
+    _, vectors = _person(rng, 25)
+
+    keep, new = compact_templates(vectors, max_templates=6, dedup_threshold=0.98)
+
+    assert len(keep) + len(new) <= 6
+    assert all(np.isclose(np.linalg.norm(v), 1.0, atol=1e-5) for v in new)
+
+
+def test_compacted_person_still_matches():
+    rng = np.random.default_rng(2)
+    people = {pid: _person(rng, 4) for pid in range(1, 30)}
+    identity, vectors = _person(rng, 40)
+    people[99] = (identity, vectors)
+
+    keep, new = compact_templates(vectors, max_templates=5, dedup_threshold=0.98)
+    compacted = np.vstack([vectors[keep], *new]) if new else vectors[keep]
+
+    before = {pid: _centroid(v) for pid, (_, v) in people.items()}
+    after = {**before, 99: _centroid(compacted)}
+    assert float(before[99] @ after[99]) > 0.99
+
+    probes = _unit(identity + 0.35 * _unit(rng.standard_normal((20, 512))))
+    for probe in probes:
+        assert _best(probe, before) == 99
+        assert _best(probe, after) == 99
+
+
+def test_compact_personnel_replaces_rows(monkeypatch):
+    rng = np.random.default_rng(3)
+    _, vectors = _person(rng, 12)
+    rows = [(100 + i, v) for i, v in enumerate(vectors)]
+    calls = []
+
+    async def get_rows(personnel_id, model_version=None):
+        return rows
+
+    async def replace(personnel_id, delete_ids, new, model_version=None):
+        calls.append((personnel_id, delete_ids, new))
+
+    monkeypatch.setattr(database, "get_embeddings_by_personnel", get_rows)
+    monkeypatch.setattr(database, "replace_embeddings", replace)
+
+    before, after = asyncio.run(
+        gallery_compaction.compact_personnel(7, max_templates=4, dedup_threshold=0.98)
+    )
+
+    assert before == 12
+    assert after <= 4
+    [(personnel_id, delete_ids, new)] = calls
+    assert personnel_id == 7
+    assert set(delete_ids) <= {row_id for row_id, _ in rows}
+    assert 12 - len(delete_ids) + len(new) == after
+
+
+def test_compact_personnel_dry_run_writes_nothing(monkeypatch):
+    rng = np.random.default_rng(4)
+    _, vectors = _person(rng, 12)
+
+    async def get_rows(personnel_id, model_version=None):
+        return [(i, v) for i, v in enumerate(vectors)]
+
+    async def replace(*args, **kwargs):
+        raise AssertionError("dry run must not write")
+
+    monkeypatch.setattr(database, "get_embeddings_by_personnel", get_rows)
+    monkeypatch.setattr(database, "replace_embeddings", replace)
+
+    before, after = asyncio.run(
+        gallery_compaction.compact_personnel(
+            7, max_templates=4, dedup_threshold=0.98, dry_run=True
+        )
+    )
+    assert before == 12 and after <= 4
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import inference_queue
+from inference_queue import (
+    PRIORITY_RECOGNIZE,
+    PRIORITY_REGISTER,
+    DeadlineExceededError,
+    InferenceQueue,
+    QueueFullError,
+)
+
+
+def _blocking_job(release: threading.Event):
+    release.wait(5)
+    return "blocker"
+
+
+async def _wait_for(predicate, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > end:
+            raise AssertionError("condition not reached")
+        await asyncio.sleep(0.005)
+
+
+def test_runs_job_and_returns_result():
+    async def main():
+        q = InferenceQueue(max_depth=4, concurrency=1)
+        return await q.submit(lambda a, b: a + b, 2, 3)
+
+    assert asyncio.run(main()) == 5
+
+
+def test_propagates_job_exception():
+    def boom():
+        raise ValueError("bad frame")
+
+    async def main():
+        q = InferenceQueue(max_depth=4, concurrency=1)
+        await q.submit(boom)
+
+    with pytest.raises(ValueError, match="bad frame"):
+        asyncio.run(main())
+
+
+def test_waiting_jobs_run_by_priority_then_arrival():
+    order = []
+
+    async def main():
+        q = InferenceQueue(max_depth=8, concurrency=1)
+        release = threading.Event()
+        blocker = asyncio.create_task(q.submit(_blocking_job, release))
+        await _wait_for(lambda: q.stats()["running"] == 1)
+
+        jobs = [
+            asyncio.create_task(q.submit(order.append, name, priority=prio))
+            for name, prio in [
+                ("register-1", PRIORITY_REGISTER),
+                ("recognize-1", PRIORITY_RECOGNIZE),
+                ("register-2", PRIORITY_REGISTER),
+                ("recognize-2", PRIORITY_RECOGNIZE),
+            ]
+        ]
+        await _wait_for(lambda: q.depth() == 4)
+        release.set()
+        await asyncio.gather(blocker, *jobs)
+
+    asyncio.run(main())
+    assert order == ["recognize-1", "recognize-2", "register-1", "register-2"]
+
+
+def test_full_queue_evicts_lower_priority_job():
+    async def main():
+        q = InferenceQueue(max_depth=1, concurrency=1)
+        release = threading.Event()
+        blocker = asyncio.create_task(q.submit(_blocking_job, release))
+        await _wait_for(lambda: q.stats()["running"] == 1)
+
+        register = asyncio.create_task(
+            q.submit(lambda: "register", priority=PRIORITY_REGISTER)
+        )
+        await _wait_for(lambda: q.depth() == 1)
+        recognize = asyncio.create_task(
+            q.submit(lambda: "recognize", priority=PRIORITY_RECOGNIZE)
+        )
+        with pytest.raises(QueueFullError):
+            await register
+        release.set()
+        return await recognize, await blocker, q.stats()["rejected"]
+
+    assert asyncio.run(main()) == ("recognize", "blocker", 1)
+
+
+def test_full_queue_rejects_same_priority_job():
+    async def main():
+        q = InferenceQueue(max_depth=1, concurrency=1)
+        release = threading.Event()
+        blocker = asyncio.create_task(q.submit(_blocking_job, release))
+        await _wait_for(lambda: q.stats()["running"] == 1)
+        waiting = asyncio.create_task(q.submit(lambda: "first"))
+        await _wait_for(lambda: q.depth() == 1)
+        try:
+            with pytest.raises(QueueFullError) as exc_info:
+                await q.submit(lambda: "second")
+            assert exc_info.value.retry_after >= 1
+        finally:
+            release.set()
+        return await waiting, await blocker
+
+    assert asyncio.run(main()) == ("first", "blocker")
+
+
+def test_job_expiring_while_queued_is_dropped():
+    ran = []
+
+    async def main():
+        q = InferenceQueue(max_depth=4, concurrency=1)
+        release = threading.Event()
+        blocker = asyncio.create_task(q.submit(_blocking_job, release))
+        await _wait_for(lambda: q.stats()["running"] == 1)
+        late = asyncio.create_task(
+            q.submit(ran.append, "late", deadline=time.monotonic() + 0.05)
+        )
+        await asyncio.sleep(0.1)
+        release.set()
+        await blocker
+        with pytest.raises(DeadlineExceededError):
+            await late
+        return q.stats()["expired"]
+
+    assert asyncio.run(main()) == 1
+    assert ran == []
+
+
+def test_past_deadline_rejected_at_submission():
+    async def main():
+        q = InferenceQueue(max_depth=4, concurrency=1)
+        await q.submit(lambda: None, deadline=time.monotonic() - 1)
+
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(main())
+
+
+def test_deadline_for_uses_class_default(monkeypatch):
+    monkeypatch.setitem(inference_queue._DEFAULT_DEADLINES, PRIORITY_RECOGNIZE, 10.0)
+    before = time.monotonic()
+    deadline = inference_queue.deadline_for(PRIORITY_RECOGNIZE, {})
+    assert before + 10.0 <= deadline <= time.monotonic() + 10.0
+
+
+def test_deadline_for_caller_header_replaces_default(monkeypatch):
+    monkeypatch.setitem(inference_queue._DEFAULT_DEADLINES, PRIORITY_RECOGNIZE, 10.0)
+    headers = {inference_queue.TIMEOUT_HEADER: "120000"}
+    deadline = inference_queue.deadline_for(PRIORITY_RECOGNIZE, headers)
+    assert deadline - time.monotonic() == pytest.approx(120.0, abs=1.0)
+
+
+def test_deadline_for_caller_header_without_default(monkeypatch):
+    monkeypatch.setitem(inference_queue._DEFAULT_DEADLINES, PRIORITY_REGISTER, 0.0)
+    assert inference_queue.deadline_for(PRIORITY_REGISTER, {}) is None
+    headers = {inference_queue.TIMEOUT_HEADER: "500"}
+    deadline = inference_queue.deadline_for(PRIORITY_REGISTER, headers)
+    assert deadline - time.monotonic() == pytest.approx(0.5, abs=0.1)
+
+
+@pytest.mark.parametrize("raw", ["soon", "-5", "0", "inf", "nan"])
+def test_deadline_for_ignores_unusable_header(monkeypatch, raw):
+    monkeypatch.setitem(inference_queue._DEFAULT_DEADLINES, PRIORITY_RECOGNIZE, 10.0)
+    headers = {inference_queue.TIMEOUT_HEADER: raw}
+    deadline = inference_queue.deadline_for(PRIORITY_RECOGNIZE, headers)
+    assert deadline - time.monotonic() == pytest.approx(10.0, abs=1.0)
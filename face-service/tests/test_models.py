@@ -0,0 +1,48 @@
+import json
+import math
+
+import pytest
+from pydantic import ValidationError
+
+from models import RecognizeRequest
+
+
+def _request(roi):
+    return RecognizeRequest(image="x", station_id=1, roi=roi)
+
+
+def test_roi_is_optional():
+    assert _request(None).roi is None
+    assert RecognizeRequest(image="x", station_id=1).roi is None
+
+
+def test_accepts_a_valid_box():
+    assert _request([10, 20.5, 110, 140]).roi == [10.0, 20.5, 110.0, 140.0]
+    # Boxes partly outside the frame are fine; the crop is clipped later.
+    assert _request([-40, -10, 60, 90]).roi == [-40.0, -10.0, 60.0, 90.0]
+
+
+@pytest.mark.parametrize(
+    "roi",
+    [
+        [0, 0, math.inf, 100],
+        [-math.inf, 0, 100, 100],
+        [0, math.nan, 100, 100],
+        [0, 0, 1e309, 100],
+        [100, 0, 50, 100],  # x2 < x1
+        [0, 100, 100, 50],  # y2 < y1
+        [10, 10, 10, 50],  # zero width
+        [0, 0, 100],
+        [0, 0, 100, 100, 5],
+    ],
+)
+def test_rejects_invalid_boxes(roi):
+    with pytest.raises(ValidationError):
+        _request(roi)
+
+
+def test_rejects_json_infinity():
+    # FastAPI parses bodies with json.loads, which accepts Infinity and NaN.
+    body = '{"image": "x", "station_id": 1, "roi": [0, 0, Infinity, 10]}'
+    with pytest.raises(ValidationError, match="finite"):
+        RecognizeRequest.model_validate(json.loads(body))
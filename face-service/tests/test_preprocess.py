@@ -0,0 +1,59 @@
+import cv2
+import numpy as np
+import pytest
+
+import preprocess
+
+SIZE = (80, 80)
+
+
+def _frame(height=480, width=640):
+    rng = np.random.default_rng(0)
+    small = rng.integers(0, 256, (height // 16, width // 16, 3), dtype=np.uint8)
+    return cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC)
+
+
+def _crop_then_pad(image, x, y, crop_size):
+    """The liveness preprocessing ``liveness_input`` replaced."""
+    h, w = image.shape[:2]
+    crop = image[max(0, y) : min(h, y + crop_size), max(0, x) : min(w, x + crop_size)]
+    crop = cv2.copyMakeBorder(
+        crop,
+        max(0, -y),
+        max(0, y + crop_size - h),
+        max(0, -x),
+        max(0, x + crop_size - w),
+        cv2.BORDER_REFLECT_101,
+    )
+    rgb = cv2.cvtColor(cv2.resize(crop, SIZE), cv2.COLOR_BGR2RGB)
+    return (rgb.astype(np.float32) / 255.0).transpose(2, 0, 1)[None]
+
+
+@pytest.mark.parametrize(
+    "x, y, crop_size",
+    [
+        (200, 150, 240),  # inside the frame
+        (-40, 150, 240),  # small pad on the left
+        (500, 300, 400),  # pad larger than the visible crop
+        (600, 400, 200),  # only a 40x80 corner is visible
+        (-300, -300, 400),  # mostly above and left of the frame
+        (-30, 100, 800),  # square larger than the frame
+    ],
+)
+def test_liveness_input_matches_crop_then_reflect(x, y, crop_size):
+    image = _frame()
+
+    blob = preprocess.liveness_input(image, x, y, crop_size, SIZE)
+
+    assert blob.shape == (1, 3, 80, 80) and blob.dtype == np.float32
+    expected = _crop_then_pad(image, x, y, crop_size)
+    assert np.abs(blob - expected).max() * 255 <= 1.0 + 1e-3
+
+
+def test_liveness_input_reuses_its_buffer():
+    image = _frame()
+
+    first = preprocess.liveness_input(image, 10, 10, 100, SIZE)
+    second = preprocess.liveness_input(image, 300, 200, 100, SIZE)
+
+    assert first is second
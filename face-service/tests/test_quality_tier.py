@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+import config
+import inference_queue
+import quality_tier
+from quality_tier import TierController
+
+
+def _controller(max_tier=3):
+    return TierController(
+        max_tier=max_tier,
+        queue_high=4,
+        latency_high_s=1.0,
+        recovery_s=10.0,
+        det_size=320,
+    )
+
+
+def test_disabled_by_default():
+    assert config.QUALITY_TIERS_ENABLED is False
+    assert quality_tier.controller.max_tier == 0
+
+
+def test_each_tier_does_less_work_than_the_one_above():
+    tiers = _controller().tiers
+
+    assert [t.level for t in tiers] == [0, 1, 2, 3]
+    assert tiers[0].det_size is None and tiers[0].liveness and tiers[0].refine
+    for upper, lower in zip(tiers, tiers[1:]):
+        work_upper = (upper.det_size or 640, upper.liveness, upper.refine)
+        work_lower = (lower.det_size or 640, lower.liveness, lower.refine)
+        assert work_lower != work_upper
+        assert all(lo <= up for lo, up in zip(work_lower, work_upper))
+
+
+def test_steps_down_one_tier_per_overloaded_check():
+    controller = _controller(max_tier=2)
+
+    assert controller.evaluate(depth=4, now=0.0) == 1
+    controller.record_latency(2.0)
+    assert controller.evaluate(depth=0, now=1.0) == 2
+    assert controller.evaluate(depth=9, now=2.0) == 2
+
+
+def test_steps_up_after_a_calm_recovery_period():
+    controller = _controller()
+    controller.evaluate(depth=4, now=0.0)
+    controller.evaluate(depth=4, now=1.0)
+
+    assert controller.evaluate(depth=0, now=2.0) == 2
+    assert controller.evaluate(depth=0, now=11.0) == 2
+    assert controller.evaluate(depth=0, now=12.0) == 1
+    # Between half and the full limit neither steps nor counts as calm.
+    assert controller.evaluate(depth=3, now=30.0) == 1
+    assert controller.evaluate(depth=0, now=31.0) == 1
+    assert controller.evaluate(depth=0, now=41.0) == 0
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        inference_queue.QueueFullError("full"),
+        inference_queue.DeadlineExceededError("late"),
+    ],
+)
+def test_recognize_records_latency_of_rejected_requests(monkeypatch, error):
+    pytest.importorskip("insightface")
+    from starlette.requests import Request
+
+    from models import RecognizeRequest
+    from routes import recognize
+
+    async def submit(*args, **kwargs):
+        raise error
+
+    controller = _controller()
+    monkeypatch.setattr(quality_tier, "controller", controller)
+    monkeypatch.setattr(inference_queue.queue, "submit", submit)
+    monkeypatch.setattr(recognize, "decode_image", lambda data: object())
+    request = Request({"type": "http", "headers": []})
+
+    with pytest.raises(type(error)):
+        asyncio.run(
+            recognize.recognize(RecognizeRequest(image="", station_id=1), request)
+        )
+
+    assert len(controller._latencies) == 1
@@ -0,0 +1,47 @@
+import importlib
+
+import pytest
+
+import readiness
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    importlib.reload(readiness)
+    yield
+    importlib.reload(readiness)
+
+
+def test_starts_not_ready():
+    assert readiness.state() == readiness.STARTING
+    assert not readiness.is_ready()
+    assert not readiness.is_failed()
+    assert readiness.error() is None
+
+
+def test_mark_ready():
+    readiness.mark_ready()
+    assert readiness.state() == readiness.READY
+    assert readiness.is_ready()
+    assert not readiness.is_failed()
+
+
+def test_mark_failed_records_error():
+    readiness.mark_failed(RuntimeError("model download failed"))
+    assert readiness.is_failed()
+    assert not readiness.is_ready()
+    assert readiness.error() == "model download failed"
+
+
+def test_mark_failed_without_message_uses_exception_name():
+    readiness.mark_failed(TimeoutError())
+    assert readiness.error() == "TimeoutError"
+
+
+def test_request_shutdown_sends_sigterm(monkeypatch):
+    sent = []
+    monkeypatch.setattr(readiness.signal, "raise_signal", sent.append)
+
+    readiness.request_shutdown()
+
+    assert sent == [readiness.signal.SIGTERM]
@@ -0,0 +1,138 @@
+import argparse
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+import config
+import database
+import enrolment_archive
+import reembed
+
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 16
+
+
+class Run:
+    """Stubs the models and database around :func:`reembed.run`."""
+
+    def __init__(self, monkeypatch, fail_on=None):
+        self.embedded: list[tuple[int, str]] = []
+        self.written: list[int] = []
+        self.fail_on = fail_on
+
+        async def load_models(concurrency):
+            return concurrency
+
+        async def nothing():
+            pass
+
+        monkeypatch.setattr(reembed, "_load_models", load_models)
+        monkeypatch.setattr(reembed, "_embed_file", self.embed)
+        monkeypatch.setattr(database, "create_pool", nothing)
+        monkeypatch.setattr(database, "close_pool", nothing)
+        monkeypatch.setattr(database, "set_embeddings", self.set_embeddings)
+
+    def embed(self, personnel_id, name):
+        self.embedded.append((personnel_id, name))
+        return np.ones(4, dtype=np.float32)
+
+    async def set_embeddings(self, personnel_id, embeddings, model_version):
+        if personnel_id == self.fail_on:
+            raise RuntimeError("database went away")
+        self.written.append(personnel_id)
+
+    def people(self) -> list[int]:
+        return sorted({pid for pid, _ in self.embedded})
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ENROLMENT_IMAGE_DIR", str(tmp_path / "images"))
+    monkeypatch.setattr(config, "INFERENCE_WORKERS", 0)
+    for personnel_id in (1, 2, 3, 4):
+        enrolment_archive.save(personnel_id, [JPEG, JPEG])
+    return tmp_path
+
+
+def _args(tmp_path, **overrides):
+    args = dict(
+        checkpoint=str(tmp_path / "checkpoint.json"),
+        model_version="v2",
+        restart=False,
+        batch_images=4,
+        concurrency=2,
+        compact=False,
+    )
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+def test_batches_group_whole_people_by_image_count():
+    work = [(1, ["a"]), (2, ["a", "b", "c"]), (3, ["a", "b"]), (4, ["a"])]
+
+    batches = list(reembed._batches(work, batch_images=3))
+
+    assert [[pid for pid, _ in batch] for batch in batches] == [[1, 2], [3, 4]]
+
+
+def test_run_embeds_every_archived_image(archive, monkeypatch):
+    stub = Run(monkeypatch)
+
+    asyncio.run(reembed.run(_args(archive)))
+
+    assert len(stub.embedded) == 8
+    assert sorted(stub.written) == [1, 2, 3, 4]
+    with open(archive / "checkpoint.json", encoding="utf-8") as fh:
+        checkpoint = json.load(fh)
+    assert checkpoint["model_version"] == "v2"
+    assert sorted(checkpoint["done"]) == ["1", "2", "3", "4"]
+
+
+def test_second_run_resumes_after_a_partial_checkpoint(archive, monkeypatch):
+    # Two people per batch: the first batch is checkpointed, then the
+    # write of person 3 fails.
+    first = Run(monkeypatch, fail_on=3)
+    with pytest.raises(RuntimeError):
+        asyncio.run(reembed.run(_args(archive)))
+    assert first.written == [1, 2]
+
+    second = Run(monkeypatch)
+    asyncio.run(reembed.run(_args(archive)))
+
+    assert second.people() == [3, 4]
+    assert second.written == [3, 4]
+
+
+def test_changed_image_set_is_embedded_again(archive, monkeypatch):
+    Run(monkeypatch)
+    asyncio.run(reembed.run(_args(archive)))
+
+    enrolment_archive.save(2, [JPEG])
+    stub = Run(monkeypatch)
+    asyncio.run(reembed.run(_args(archive)))
+
+    assert stub.people() == [2]
+    assert len(stub.embedded) == 3
+
+
+def test_finished_run_has_nothing_left(archive, monkeypatch):
+    Run(monkeypatch)
+    asyncio.run(reembed.run(_args(archive)))
+
+    stub = Run(monkeypatch)
+    asyncio.run(reembed.run(_args(archive)))
+
+    assert stub.embedded == []
+
+
+def test_checkpoint_for_another_version_needs_restart(archive, monkeypatch):
+    Run(monkeypatch)
+    asyncio.run(reembed.run(_args(archive)))
+
+    with pytest.raises(SystemExit, match="use --restart"):
+        asyncio.run(reembed.run(_args(archive, model_version="v3")))
+
+    stub = Run(monkeypatch)
+    asyncio.run(reembed.run(_args(archive, model_version="v3", restart=True)))
+    assert stub.people() == [1, 2, 3, 4]
@@ -0,0 +1,98 @@
+import base64
+import json
+
+import numpy as np
+import pytest
+
+from models import RegisterResponse
+from response_encoding import (
+    BASE64_MEDIA_TYPE,
+    BINARY_MEDIA_TYPE,
+    FORMAT_BASE64,
+    FORMAT_BINARY,
+    FORMAT_JSON,
+    negotiate_embeddings,
+    register_response,
+)
+
+
+def _embeddings(count=2, dim=8):
+    rng = np.random.default_rng(0)
+    return [rng.standard_normal(dim).astype(np.float32) for _ in range(count)]
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, (FORMAT_JSON, "float32")),
+        ("", (FORMAT_JSON, "float32")),
+        # axios' default, sent by the NestJS API
+        ("application/json, text/plain, */*", (FORMAT_JSON, "float32")),
+        ("*/*", (FORMAT_JSON, "float32")),
+        (BINARY_MEDIA_TYPE, (FORMAT_BINARY, "float32")),
+        (f"{BASE64_MEDIA_TYPE}; dtype=float16", (FORMAT_BASE64, "float16")),
+        (f'{BINARY_MEDIA_TYPE}; dtype="FLOAT16"', (FORMAT_BINARY, "float16")),
+        # Header order breaks ties; higher q wins otherwise.
+        (f"{BINARY_MEDIA_TYPE}, application/json", (FORMAT_BINARY, "float32")),
+        (
+            f"application/json;q=0.5, {BINARY_MEDIA_TYPE};q=0.9",
+            (FORMAT_BINARY, "float32"),
+        ),
+        # Unknown types, unknown dtypes and q=0 are skipped.
+        (f"text/html, {BASE64_MEDIA_TYPE}", (FORMAT_BASE64, "float32")),
+        (f"{BINARY_MEDIA_TYPE}; dtype=float64, */*", (FORMAT_JSON, "float32")),
+        (f"{BINARY_MEDIA_TYPE};q=0, application/json", (FORMAT_JSON, "float32")),
+        (f"{BINARY_MEDIA_TYPE};q=abc", (FORMAT_JSON, "float32")),
+        ("image/png", (FORMAT_JSON, "float32")),
+    ],
+)
+def test_negotiate_embeddings(accept, expected):
+    assert negotiate_embeddings(accept) == expected
+
+
+def test_json_response_keeps_float_lists():
+    embeddings = _embeddings()
+
+    response = register_response(True, embeddings, FORMAT_JSON, "float32")
+
+    assert isinstance(response, RegisterResponse)
+    assert response.embeddings == [emb.tolist() for emb in embeddings]
+
+
+@pytest.mark.parametrize("dtype, np_dtype", [("float32", "<f4"), ("float16", "<f2")])
+def test_base64_response_round_trips(dtype, np_dtype):
+    embeddings = _embeddings()
+
+    response = register_response(True, embeddings, FORMAT_BASE64, dtype)
+
+    assert response.media_type == f"{BASE64_MEDIA_TYPE}; dtype={dtype}"
+    body = json.loads(response.body)
+    assert body["success"] and body["dtype"] == dtype and body["dim"] == 8
+    decoded = [
+        np.frombuffer(base64.b64decode(text), dtype=np_dtype)
+        for text in body["embeddings"]
+    ]
+    for got, emb in zip(decoded, embeddings):
+        np.testing.assert_array_equal(got, emb.astype(np_dtype))
+
+
+@pytest.mark.parametrize("dtype, np_dtype", [("float32", "<f4"), ("float16", "<f2")])
+def test_binary_response_is_one_matrix_with_headers(dtype, np_dtype):
+    embeddings = _embeddings(count=3)
+
+    response = register_response(True, embeddings, FORMAT_BINARY, dtype)
+
+    assert response.media_type == f"{BINARY_MEDIA_TYPE}; dtype={dtype}"
+    assert response.headers["x-embedding-count"] == "3"
+    assert response.headers["x-embedding-dim"] == "8"
+    assert response.headers["x-embedding-dtype"] == dtype
+    matrix = np.frombuffer(response.body, dtype=np_dtype).reshape(3, 8)
+    np.testing.assert_array_equal(matrix, np.stack(embeddings).astype(np_dtype))
+
+
+@pytest.mark.parametrize("success, embeddings", [(False, []), (True, [])])
+def test_binary_failure_stays_json(success, embeddings):
+    response = register_response(success, embeddings, FORMAT_BINARY, "float32")
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {"success": success, "embeddings": []}
@@ -0,0 +1,107 @@
+import base64
+
+import cv2
+import numpy as np
+import pytest
+
+import config
+import utils
+from utils import DecodedImage, ImageTooLargeError
+
+
+def _smooth_image(width: int, height: int) -> np.ndarray:
+    """A compressible test image (gradients) of the given size."""
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[..., 0] = x[None, :]
+    image[..., 1] = y[:, None]
+    image[..., 2] = 128
+    return image
+
+
+def _encode(image: np.ndarray, ext: str) -> bytes:
+    ok, buf = cv2.imencode(ext, image)
+    assert ok
+    return buf.tobytes()
+
+
+def test_jpeg_dimensions_reads_frame_header():
+    data = _encode(_smooth_image(321, 123), ".jpg")
+    assert utils.jpeg_dimensions(data) == (321, 123)
+    assert utils.jpeg_dimensions(b"\x89PNG") is None
+
+
+def test_png_dimensions_reads_ihdr():
+    data = _encode(_smooth_image(64, 48), ".png")
+    assert utils.png_dimensions(data) == (64, 48)
+    assert utils.png_dimensions(b"\xff\xd8\xff") is None
+
+
+def test_small_jpeg_decodes_at_full_resolution():
+    decoded = utils.decode_image_bytes(_encode(_smooth_image(640, 480), ".jpg"))
+    assert decoded.scale == 1
+    assert decoded.image.shape == (480, 640, 3)
+
+
+def test_large_jpeg_decodes_reduced():
+    data = _encode(_smooth_image(2600, 1950), ".jpg")
+    decoded = utils.decode_image_bytes(data, target_size=640)
+    assert decoded.scale == 4
+    assert decoded.image.shape == (488, 650, 3)
+    assert decoded.full_resolution().shape == (1950, 2600, 3)
+
+
+def test_base64_data_uri_is_accepted():
+    data = _encode(_smooth_image(100, 80), ".png")
+    uri = "data:image/png;base64," + base64.b64encode(data).decode("ascii")
+    decoded = utils.decode_image(uri)
+    assert decoded.scale == 1
+    assert decoded.image.shape == (80, 100, 3)
+    assert decoded.data == data
+
+
+def test_pixel_limit_rejects_before_decoding(monkeypatch):
+    monkeypatch.setattr(config, "MAX_IMAGE_PIXELS", 100 * 100)
+    data = _encode(_smooth_image(200, 200), ".jpg")
+    with pytest.raises(ImageTooLargeError):
+        utils.decode_image_bytes(data)
+
+
+def test_byte_limit_rejects_payload(monkeypatch):
+    monkeypatch.setattr(config, "MAX_IMAGE_BYTES", 10)
+    data = _encode(_smooth_image(50, 50), ".png")
+    with pytest.raises(ImageTooLargeError):
+        utils.decode_image_bytes(data)
+    with pytest.raises(ImageTooLargeError):
+        utils.decode_image(base64.b64encode(data).decode("ascii"))
+
+
+@pytest.mark.parametrize("ext", [".bmp", ".tiff", ".webp"])
+def test_formats_without_header_check_are_rejected(ext):
+    ok, buf = cv2.imencode(ext, _smooth_image(32, 32))
+    if not ok:
+        pytest.skip(f"OpenCV cannot encode {ext}")
+    with pytest.raises(ValueError, match="Unsupported image format"):
+        utils.decode_image_bytes(buf.tobytes())
+
+
+def test_garbage_is_rejected():
+    with pytest.raises(ValueError):
+        utils.decode_image_bytes(b"not an image at all")
+
+
+def test_full_resolution_crop_returns_offset():
+    data = _encode(_smooth_image(2600, 1950), ".jpg")
+    decoded = utils.decode_image_bytes(data, target_size=640)
+    crop, (ox, oy) = decoded.full_resolution_crop(
+        np.array([1000, 800, 1100, 900]), margin=0.5
+    )
+    assert (ox, oy) == (950, 750)
+    assert crop.shape == (201, 201, 3)
+
+
+def test_decoded_image_at_full_scale_reuses_frame():
+    image = _smooth_image(10, 10)
+    decoded = DecodedImage(image, 1, b"")
+    assert decoded.full_resolution() is image
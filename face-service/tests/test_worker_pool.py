@@ -0,0 +1,156 @@
+import asyncio
+import logging
+
+import numpy as np
+import pytest
+
+import config
+import worker_pool
+from models import WorkersResponse
+from worker_pool import WorkerPool
+
+
+class FakeConn:
+    """Pipe end that records what is sent and answers every job with *reply*."""
+
+    def __init__(self, reply=("ok", [], 0.01)):
+        self.sent = []
+        self.reply = reply
+
+    def send(self, msg):
+        self.sent.append(msg)
+
+    def recv(self):
+        if isinstance(self.reply, BaseException):
+            raise self.reply
+        return self.reply
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(workers=2, slot_bytes=1024, pin=False, threads=1):
+        pool = WorkerPool(workers, threads, pin, slot_bytes)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.stop()
+
+
+def _started(pool, conns):
+    """Mark *pool* as started with fake pipes instead of worker processes."""
+    for worker, conn in zip(pool._workers, conns):
+        worker.conn = conn
+        pool._idle.put(worker)
+    pool._live = len(conns)
+    pool.running = True
+    return pool
+
+
+@pytest.mark.skipif(
+    not hasattr(worker_pool.os, "sched_getaffinity"), reason="Linux only"
+)
+def test_pins_workers_by_pool_size_not_config(make_pool, monkeypatch):
+    monkeypatch.setattr(config, "INFERENCE_WORKERS", 0)
+    available = sorted(worker_pool.os.sched_getaffinity(0))
+
+    pool = make_pool(workers=2, pin=True, threads=0)
+
+    per_worker = max(1, len(available) // 2)
+    assert [len(w._cpus) for w in pool._workers] == [per_worker, per_worker]
+
+
+def test_frames_go_through_the_slot(make_pool):
+    pool = _started(make_pool(workers=1, slot_bytes=1024), [FakeConn()])
+    image = np.arange(300, dtype=np.uint8).reshape(10, 10, 3)
+
+    assert pool.detect_faces(image, 320) == []
+
+    [(shape, dtype, payload, input_size)] = pool._workers[0].conn.sent
+    assert (shape, payload, input_size) == ((10, 10, 3), None, 320)
+    slot = np.ndarray(shape, dtype=dtype, buffer=pool._workers[0].shm.buf)
+    np.testing.assert_array_equal(slot, image)
+
+
+def test_oversized_frame_is_pickled_and_logged(make_pool, caplog):
+    pool = _started(make_pool(workers=1, slot_bytes=1024), [FakeConn()])
+    image = np.zeros((40, 40, 3), dtype=np.uint8)
+
+    with caplog.at_level(logging.WARNING, logger="worker_pool"):
+        pool.detect_faces(image)
+
+    [(_, _, payload, _)] = pool._workers[0].conn.sent
+    assert payload is image
+    assert "exceeds the 1024-byte slot" in caplog.text
+
+
+def test_dead_worker_is_restarted_and_job_retried(make_pool, monkeypatch):
+    pool = _started(make_pool(workers=1), [FakeConn(EOFError())])
+    worker = pool._workers[0]
+
+    def restart():
+        worker.conn = FakeConn(("ok", ["face"], 0.01))
+
+    monkeypatch.setattr(worker, "restart", restart)
+
+    assert pool.detect_faces(np.zeros((4, 4, 3), np.uint8)) == ["face"]
+    assert pool._idle.qsize() == 1
+
+
+def test_failed_restart_retires_the_worker(make_pool, monkeypatch):
+    pool = _started(make_pool(workers=2), [FakeConn(EOFError()), FakeConn()])
+    broken, healthy = pool._workers
+
+    def restart():
+        raise RuntimeError("Inference worker 0 did not start")
+
+    monkeypatch.setattr(broken, "restart", restart)
+    frame = np.zeros((4, 4, 3), np.uint8)
+
+    with pytest.raises(RuntimeError, match="did not start"):
+        pool.detect_faces(frame)
+
+    assert broken.retired and broken.conn is None
+    assert pool.stats()[0]["retired"]
+    monkeypatch.setattr(worker_pool, "pool", pool)
+    shown = WorkersResponse(mode="worker_pool", workers=worker_pool.stats())
+    assert [w["retired"] for w in shown.model_dump()["workers"]] == [True, False]
+    # Only the healthy worker is handed out from now on.
+    for _ in range(3):
+        assert pool.detect_faces(frame) == []
+    assert len(healthy.conn.sent) == 3
+
+
+def test_no_workers_left_raises_instead_of_blocking(make_pool, monkeypatch):
+    pool = _started(make_pool(workers=1), [FakeConn(BrokenPipeError())])
+    worker = pool._workers[0]
+
+    def restart():
+        raise RuntimeError("Inference worker 0 failed to start")
+
+    monkeypatch.setattr(worker, "restart", restart)
+    frame = np.zeros((4, 4, 3), np.uint8)
+
+    with pytest.raises(RuntimeError, match="failed to start"):
+        pool.detect_faces(frame)
+    with pytest.raises(RuntimeError, match="No inference workers left"):
+        pool.detect_faces(frame)
+
+
+def test_health_workers_reports_retired_workers(make_pool, monkeypatch):
+    pytest.importorskip("insightface")
+    from routes import health
+
+    pool = _started(make_pool(workers=2), [FakeConn(), FakeConn()])
+    pool._workers[1].retired = True
+    monkeypatch.setattr(worker_pool, "pool", pool)
+
+    response = asyncio.run(health.workers())
+
+    assert [w.retired for w in response.workers] == [False, True]
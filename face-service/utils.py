@@ -2,31 +2,210 @@
 
 import base64
 import logging
+from typing import Optional
 
 import cv2
 import numpy as np
 
+import config
+
 logger = logging.getLogger(__name__)
 
+# JPEG start-of-frame markers carrying the image dimensions (DHT/JPG/DAC
+# markers 0xC4, 0xC8 and 0xCC share the range but are not frames).
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Reduced-resolution decode flags, largest reduction first.
+_REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+class ImageTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured byte or pixel limits."""
+
 
-def decode_base64_image(base64_str: str) -> np.ndarray:
-    """Decode a base64-encoded image string to an OpenCV BGR image.
+class DecodedImage:
+    """A decoded frame that may have been decoded at reduced resolution.
 
-    Handles optional data URI prefix (e.g. 'data:image/jpeg;base64,...').
+    ``image`` is ``scale`` times smaller than the original in each
+    dimension.  The encoded bytes are kept so a region can be re-decoded at
+    full resolution when a face is too small for reliable alignment.
     """
-    if "," in base64_str:
-        base64_str = base64_str.split(",", 1)[1]
 
-    img_bytes = base64.b64decode(base64_str)
-    img_array = np.frombuffer(img_bytes, dtype=np.uint8)
-    image = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+    def __init__(self, image: np.ndarray, scale: int, data: bytes):
+        self.image = image
+        self.scale = scale
+        self._data = data
+        self._full: Optional[np.ndarray] = None if scale > 1 else image
+
+    @property
+    def data(self) -> bytes:
+        """The encoded image bytes as uploaded."""
+        return self._data
+
+    def full_resolution(self) -> np.ndarray:
+        """Return the full-resolution frame, decoding it on first use."""
+        if self._full is None:
+            self._full = _imdecode(self._data, cv2.IMREAD_COLOR)
+        return self._full
+
+    def full_resolution_crop(
+        self, bbox: np.ndarray, margin: float = 0.5
+    ) -> tuple[np.ndarray, tuple[int, int]]:
+        """Crop the full-resolution frame around *bbox*.
 
+        *bbox* is ``[x1, y1, x2, y2]`` in original-image coordinates and is
+        expanded by *margin* times its size on each side.  Returns the crop
+        and its ``(x, y)`` offset in the original image.
+        """
+        full = self.full_resolution()
+        h, w = full.shape[:2]
+        x1, y1, x2, y2 = [float(v) for v in bbox[:4]]
+        mx = (x2 - x1) * margin
+        my = (y2 - y1) * margin
+        cx1 = max(0, int(x1 - mx))
+        cy1 = max(0, int(y1 - my))
+        cx2 = min(w, int(x2 + mx) + 1)
+        cy2 = min(h, int(y2 + my) + 1)
+        return full[cy1:cy2, cx1:cx2], (cx1, cy1)
+
+
+def _imdecode(data: bytes, flags: int) -> np.ndarray:
+    img_array = np.frombuffer(data, dtype=np.uint8)
+    image = cv2.imdecode(img_array, flags)
     if image is None:
         raise ValueError("Failed to decode image from base64 string")
-
     return image
 
 
+def _b64_payload_bytes(base64_str: str) -> bytes:
+    """Strip any data URI prefix, enforce the byte limit and decode."""
+    if "," in base64_str:
+        base64_str = base64_str.split(",", 1)[1]
+
+    # Reject before allocating the decoded buffer.
+    approx_bytes = len(base64_str) * 3 // 4
+    if approx_bytes > config.MAX_IMAGE_BYTES:
+        raise ImageTooLargeError(
+            f"Image payload of ~{approx_bytes} bytes exceeds {config.MAX_IMAGE_BYTES}"
+        )
+    return base64.b64decode(base64_str)
+
+
+def jpeg_dimensions(data: bytes) -> Optional[tuple[int, int]]:
+    """Return ``(width, height)`` from a JPEG header without decoding.
+
+    Returns ``None`` if *data* is not a JPEG or no frame header is found.
+    """
+    if data[:2] != b"\xff\xd8":
+        return None
+
+    i = 2
+    n = len(data)
+    while i + 9 < n:
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker == 0xFF:
+            # Fill byte before the real marker.
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # Standalone markers carry no length field.
+            i += 2
+            continue
+        if marker in (0xD9, 0xDA):
+            # End of image / start of scan before any frame header.
+            return None
+        if marker in _JPEG_SOF_MARKERS:
+            height = int.from_bytes(data[i + 5 : i + 7], "big")
+            width = int.from_bytes(data[i + 7 : i + 9], "big")
+            return width, height
+        i += 2 + int.from_bytes(data[i + 2 : i + 4], "big")
+    return None
+
+
+def png_dimensions(data: bytes) -> Optional[tuple[int, int]]:
+    """Return ``(width, height)`` from a PNG IHDR chunk, or ``None``."""
+    if data[:8] != b"\x89PNG\r\n\x1a\n" or len(data) < 24:
+        return None
+    width = int.from_bytes(data[16:20], "big")
+    height = int.from_bytes(data[20:24], "big")
+    return width, height
+
+
+def _check_pixel_limit(dims: Optional[tuple[int, int]]):
+    """Reject images whose header declares more than MAX_IMAGE_PIXELS."""
+    if dims is not None and dims[0] * dims[1] > config.MAX_IMAGE_PIXELS:
+        raise ImageTooLargeError(
+            f"Image of {dims[0]}x{dims[1]} pixels exceeds {config.MAX_IMAGE_PIXELS}"
+        )
+
+
+def _reduction_factor(width: int, height: int, target_size: int) -> int:
+    """Largest JPEG DCT scale keeping the long side at least *target_size*."""
+    long_side = max(width, height)
+    for factor, _ in _REDUCED_DECODE_FLAGS:
+        if long_side // factor >= target_size:
+            return factor
+    return 1
+
+
+def decode_image(base64_str: str, target_size: Optional[int] = None) -> DecodedImage:
+    """Decode a base64 image, at reduced resolution when it is much larger
+    than *target_size* (defaults to the detector input size).
+
+    Large JPEGs are decoded with ``IMREAD_REDUCED_COLOR_{2,4,8}`` so libjpeg
+    skips the pixels the detector would throw away when downscaling.
+    Oversized payloads are rejected with :class:`ImageTooLargeError` before
+    any pixels are decoded.  Only JPEG and PNG are accepted, since those
+    are the formats whose dimensions are checked before decoding.
+    """
+    return _decode(_b64_payload_bytes(base64_str), target_size)
+
+
+def _decode(data: bytes, target_size: Optional[int]) -> DecodedImage:
+    if target_size is None:
+        target_size = config.DECODE_TARGET_SIZE
+
+    jpeg_dims = jpeg_dimensions(data)
+    dims = jpeg_dims or png_dimensions(data)
+    if dims is None:
+        # Other formats (WebP, BMP, TIFF, ...) would reach cv2.imdecode with
+        # unchecked dimensions.
+        raise ValueError("Unsupported image format (expected JPEG or PNG)")
+    _check_pixel_limit(dims)
+
+    # Reduced decode is only a win for JPEG, where libjpeg scales in the DCT.
+    if jpeg_dims is not None and target_size > 0:
+        factor = _reduction_factor(jpeg_dims[0], jpeg_dims[1], target_size)
+        if factor > 1:
+            flag = dict(_REDUCED_DECODE_FLAGS)[factor]
+            image = _imdecode(data, flag)
+            logger.debug(
+                "Decoded %dx%d JPEG at 1/%d resolution",
+                jpeg_dims[0],
+                jpeg_dims[1],
+                factor,
+            )
+            return DecodedImage(image, factor, data)
+
+    return DecodedImage(_imdecode(data, cv2.IMREAD_COLOR), 1, data)
+
+
+def decode_image_bytes(data: bytes, target_size: Optional[int] = None) -> DecodedImage:
+    """Like :func:`decode_image` for already base64-decoded bytes."""
+    if len(data) > config.MAX_IMAGE_BYTES:
+        raise ImageTooLargeError(
+            f"Image payload of {len(data)} bytes exceeds {config.MAX_IMAGE_BYTES}"
+        )
+    return _decode(data, target_size)
+
+
 def encode_image_base64(image: np.ndarray) -> str:
     """Encode an OpenCV BGR image to a base64 string (JPEG)."""
     _, buffer = cv2.imencode(".jpg", image)
@@ -0,0 +1,326 @@
+"""Multi-process inference workers with shared-memory frame hand-off.
+
+A single process with one shared ``FaceAnalysis`` instance cannot use a
+many-core host well: pre/post-processing holds the GIL and one ONNX
+Runtime session spreads every job over all cores.  In worker-pool mode
+(``INFERENCE_WORKERS > 0``) the front process instead starts N worker
+processes that each load the models with a fixed thread budget
+(``INFERENCE_WORKER_THREADS``), optionally pinned to their own CPUs
+(``INFERENCE_WORKER_PIN_CPUS``).
+
+Each worker owns a shared-memory slot.  The front process copies the
+decoded frame into the slot and sends only its shape over a pipe; the
+worker runs detection + embedding on a zero-copy view and returns the
+(small) ``Face`` objects.  :func:`face_detector.detect_faces` delegates
+here transparently, so the inference queue and routes are unchanged.
+"""
+
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional
+
+import numpy as np
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a worker to load its models.
+_READY_TIMEOUT = 600.0
+# How often a caller waiting for an idle worker rechecks that any are left.
+_IDLE_POLL_S = 1.0
+
+
+def _worker_cpus(index: int, count: int, threads: int) -> Optional[set[int]]:
+    """CPUs worker *index* is pinned to, or ``None`` if not pinning."""
+    if not hasattr(os, "sched_getaffinity"):
+        return None
+    available = sorted(os.sched_getaffinity(0))
+    per_worker = threads if threads > 0 else max(1, len(available) // count)
+    start = (index * per_worker) % len(available)
+    return {available[(start + i) % len(available)] for i in range(per_worker)}
+
+
+def _worker_main(index: int, conn, shm_name: str, threads: int, cpus):
+    """Entry point of a worker process."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f"%(asctime)s [%(levelname)s] worker-{index} %(name)s: %(message)s",
+    )
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+    if threads > 0:
+        import cv2
+
+        cv2.setNumThreads(threads)
+
+    import face_detector
+    import face_recognizer
+
+    face_recognizer.load_model(num_threads=threads)
+    face_recognizer.warm_up()
+    shm = SharedMemory(name=shm_name)
+    conn.send(("ready", os.getpid()))
+
+    try:
+        while True:
+            msg = conn.recv()
+            if msg is None:
+                break
+            shape, dtype, payload, input_size = msg
+            if payload is None:
+                image = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            else:
+                image = payload
+            started = time.perf_counter()
+            try:
+                faces = face_detector.detect_faces(image, input_size)
+                reply = ("ok", faces, time.perf_counter() - started)
+            except Exception as exc:
+                reply = ("error", repr(exc), time.perf_counter() - started)
+            del image
+            conn.send(reply)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        shm.close()
+
+
+class _Worker:
+    """Front-process handle for one worker process and its frame slot."""
+
+    def __init__(
+        self, ctx, index: int, count: int, slot_bytes: int, threads: int, pin: bool
+    ):
+        self.index = index
+        self._ctx = ctx
+        self._threads = threads
+        self._cpus = _worker_cpus(index, count, threads) if pin else None
+        self.shm = SharedMemory(create=True, size=slot_bytes)
+        self.process = None
+        self.conn = None
+        self.pid: Optional[int] = None
+        self.jobs = 0
+        self.busy_s = 0.0
+        self.started_at = 0.0
+        # Set once a restart has failed; the pool no longer dispatches to it.
+        self.retired = False
+
+    def spawn(self):
+        parent_conn, child_conn = self._ctx.Pipe()
+        self.process = self._ctx.Process(
+            target=_worker_main,
+            args=(self.index, child_conn, self.shm.name, self._threads, self._cpus),
+            name=f"inference-worker-{self.index}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def wait_ready(self):
+        if not self.conn.poll(_READY_TIMEOUT):
+            raise RuntimeError(f"Inference worker {self.index} did not start")
+        status, pid = self.conn.recv()
+        if status != "ready":
+            raise RuntimeError(f"Inference worker {self.index} failed to start")
+        self.pid = pid
+        self.started_at = time.monotonic()
+        logger.info(
+            "Inference worker %d ready (pid %d, threads %s, cpus %s)",
+            self.index,
+            pid,
+            self._threads or "auto",
+            sorted(self._cpus) if self._cpus else "any",
+        )
+
+    def restart(self):
+        """Replace a dead worker process, keeping its frame slot."""
+        logger.warning("Restarting inference worker %d", self.index)
+        self.stop()
+        self.spawn()
+        self.wait_ready()
+
+    def run(self, image: np.ndarray, input_size: Optional[int] = None) -> list:
+        image = np.ascontiguousarray(image)
+        if image.nbytes <= self.shm.size:
+            view = np.ndarray(image.shape, dtype=image.dtype, buffer=self.shm.buf)
+            view[...] = image
+            del view
+            self.conn.send((image.shape, image.dtype.str, None, input_size))
+        else:
+            # Larger than the slot: fall back to pickling over the pipe.
+            logger.warning(
+                "Frame %s (%d bytes) exceeds the %d-byte slot of worker %d; "
+                "pickling it instead (raise INFERENCE_WORKER_SLOT_BYTES)",
+                image.shape,
+                image.nbytes,
+                self.shm.size,
+                self.index,
+            )
+            self.conn.send((image.shape, image.dtype.str, image, input_size))
+        status, result, busy = self.conn.recv()
+        self.jobs += 1
+        self.busy_s += busy
+        if status != "ok":
+            raise RuntimeError(f"Inference worker {self.index}: {result}")
+        return result
+
+    def stats(self) -> dict:
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            "index": self.index,
+            "pid": self.pid,
+            "alive": bool(self.process and self.process.is_alive()),
+            "retired": self.retired,
+            "cpus": sorted(self._cpus) if self._cpus else None,
+            "jobs": self.jobs,
+            "busy_s": round(self.busy_s, 3),
+            "utilisation": round(self.busy_s / elapsed, 4) if elapsed > 0 else 0.0,
+        }
+
+    def stop(self):
+        if self.conn is not None:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.conn.close()
+            self.conn = None
+        if self.process is not None:
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+
+
+class WorkerPool:
+    """Dispatches frames to idle workers; safe to call from many threads."""
+
+    def __init__(self, workers: int, threads: int, pin: bool, slot_bytes: int):
+        self._ctx = mp.get_context("spawn")
+        self._workers = [
+            _Worker(self._ctx, i, workers, slot_bytes, threads, pin)
+            for i in range(workers)
+        ]
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._lock = threading.Lock()
+        self._live = 0
+        self.running = False
+
+    def start(self):
+        """Start all workers and block until their models are loaded."""
+        first, rest = self._workers[0], self._workers[1:]
+        # The first worker downloads the model pack if needed; the others
+        # start once it is on disk so they do not race on the download.
+        first.spawn()
+        first.wait_ready()
+        for worker in rest:
+            worker.spawn()
+        for worker in rest:
+            worker.wait_ready()
+        for worker in self._workers:
+            self._idle.put(worker)
+        self._live = len(self._workers)
+        self.running = True
+
+    def _acquire(self) -> _Worker:
+        """Wait for an idle worker; fail if every worker has been retired."""
+        while True:
+            if self._live == 0:
+                raise RuntimeError("No inference workers left")
+            try:
+                return self._idle.get(timeout=_IDLE_POLL_S)
+            except queue.Empty:
+                continue
+
+    def _retire(self, worker: _Worker):
+        """Take a worker that could not be restarted out of rotation."""
+        worker.retired = True
+        worker.stop()
+        with self._lock:
+            self._live -= 1
+            live = self._live
+        logger.error(
+            "Inference worker %d could not be restarted; %d of %d workers left",
+            worker.index,
+            live,
+            len(self._workers),
+        )
+
+    def detect_faces(
+        self, image: np.ndarray, input_size: Optional[int] = None
+    ) -> list:
+        """Run :func:`face_detector.detect_faces` on an idle worker.
+
+        A worker that died mid-job is restarted and the job retried once.
+        If the restart fails the worker is retired instead of being handed
+        out again, and the error is raised.
+        """
+        worker = self._acquire()
+        try:
+            return worker.run(image, input_size)
+        except (EOFError, BrokenPipeError, ConnectionResetError):
+            try:
+                worker.restart()
+            except Exception:
+                self._retire(worker)
+                raise
+            return worker.run(image, input_size)
+        finally:
+            if not worker.retired:
+                self._idle.put(worker)
+
+    def size(self) -> int:
+        return len(self._workers)
+
+    def stats(self) -> list[dict]:
+        return [worker.stats() for worker in self._workers]
+
+    def stop(self):
+        self.running = False
+        for worker in self._workers:
+            worker.stop()
+            worker.shm.close()
+            worker.shm.unlink()
+
+
+pool: Optional[WorkerPool] = None
+
+
+def start():
+    """Create and start the pool if ``INFERENCE_WORKERS`` is positive."""
+    global pool
+    if config.INFERENCE_WORKERS <= 0:
+        return
+    logger.info("Starting %d inference workers", config.INFERENCE_WORKERS)
+    pool = WorkerPool(
+        workers=config.INFERENCE_WORKERS,
+        threads=config.INFERENCE_WORKER_THREADS,
+        pin=config.INFERENCE_WORKER_PIN_CPUS,
+        slot_bytes=config.INFERENCE_WORKER_SLOT_BYTES,
+    )
+    pool.start()
+
+
+def stop():
+    """Stop all worker processes and release their shared memory."""
+    global pool
+    if pool is not None:
+        pool.stop()
+        pool = None
+
+
+def is_running() -> bool:
+    """Return True if inference is dispatched to worker processes."""
+    return pool is not None and pool.running
+
+
+def stats() -> list[dict]:
+    """Per-worker counters and utilisation (empty in in-process mode)."""
+    return pool.stats() if pool is not None else []